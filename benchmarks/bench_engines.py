@@ -0,0 +1,72 @@
+"""
+Benchmark: split and merge time of each engine (pypdf vs. PyMuPDF).
+
+Runs on the benchmark corpus (see corpus.py): every page of each document
+is split into its own file, then all documents are merged into one. Each
+engine gets a fresh PDFManager and a warm-up run; the best of --repeat
+runs is reported. pypdf's reader cache is cleared before every run, so
+both engines pay for parsing the input each time.
+
+Usage:
+    python benchmarks/bench_engines.py [--repeat 3] [--profile fast]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import generate_corpus
+from logic.engines import ENGINES
+from logic.pdf_ops import PDFManager
+from logic.write_profiles import WRITE_PROFILES
+
+DEFAULT_CORPUS_DIR = os.path.join(BENCH_DIR, ".corpus")
+
+
+def best_time(manager, run, repeat):
+    run()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        manager.reader_cache.invalidate()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profile", default="fast", choices=WRITE_PROFILES)
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.corpus_dir)
+    print(f"{'operation':<16}" + "".join(f"{engine + ' (s)':>14}" for engine in ENGINES)
+          + f"{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [(f"split {name}", lambda manager, engine, path=path: manager.split_pdf(
+                      path, tempfile.mkdtemp(dir=tmp), profile=args.profile, engine=engine))
+                 for name, path in corpus.items()]
+        cases.append(("merge all", lambda manager, engine: manager.merge_pdfs(
+            list(corpus.values()), os.path.join(tmp, f"merged_{engine}.pdf"),
+            profile=args.profile, engine=engine)))
+
+        for label, operation in cases:
+            times = []
+            for engine in ENGINES:
+                manager = PDFManager(engine=engine)
+                times.append(best_time(manager, lambda: operation(manager, engine),
+                                       args.repeat))
+            print(f"{label:<16}" + "".join(f"{seconds:>14.3f}" for seconds in times)
+                  + f"{times[0] / times[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark: regular vs memory-mapped input reading (PDFManager(use_mmap=...)).
+
+Every measurement runs in a fresh Python process, so peak RSS is that of
+one operation on one input and no reader is shared through the cache.
+By default a large input full of incompressible images is generated;
+pass --input to measure a real file instead.
+
+Peak RSS comes from /proc (Linux) or resource.getrusage (macOS) and is
+not available on Windows. RSS also counts file pages the process has
+mapped and touched, which the OS can drop at any time; "anon" is the
+process's own (heap) memory after the operation, with the parsed reader
+still cached, which is where the in-memory copy of the input lives.
+
+Usage:
+    python benchmarks/bench_mmap_input.py [--size-mb 400] [--repeat 3]
+    python benchmarks/bench_mmap_input.py --input big_scan.pdf
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+OPERATIONS = ("info", "split", "merge")
+MODES = (("read", False), ("mmap", True))
+
+
+def make_input(path, size_mb):
+    import pymupdf
+
+    side = 1000  # 1000x1000 RGB = 3 MB of random samples per page
+    doc = pymupdf.open()
+    for _ in range(max(1, size_mb // 3)):
+        page = doc.new_page()
+        pix = pymupdf.Pixmap(pymupdf.csRGB, side, side, os.urandom(side * side * 3), False)
+        page.insert_image(page.rect, pixmap=pix)
+    doc.save(path)
+    doc.close()
+
+
+def _proc_status_mb(field):
+    """A memory figure from /proc/self/status in MB, or None off Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb():
+    # On Linux ru_maxrss survives exec, so a child would report the parent's
+    # peak (e.g. from generating the input); VmHWM is this process's own
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(operation, use_mmap, source, scratch):
+    """One measurement; runs in its own process and prints JSON."""
+    from logic.pdf_ops import PDFManager
+
+    manager = PDFManager(use_mmap=use_mmap)
+    start = time.perf_counter()
+    if operation == "info":
+        manager.get_pdf_info(source)
+    elif operation == "split":
+        manager.split_pdf(source, scratch, range_str="every 20")
+    else:
+        manager.merge_pdfs([source], os.path.join(scratch, "merged.pdf"))
+    seconds = time.perf_counter() - start
+    print(json.dumps({"seconds": seconds, "peak_rss_mb": peak_rss_mb(),
+                      "anon_mb": _proc_status_mb("RssAnon")}))
+
+
+def measure(operation, use_mmap, source, tmp):
+    scratch = tempfile.mkdtemp(dir=tmp)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", operation,
+         "--mmap" if use_mmap else "--no-mmap", source, scratch],
+        check=True, capture_output=True, text=True, cwd=ROOT,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _, _, operation, flag, source, scratch = sys.argv
+        run_child(operation, flag == "--mmap", source, scratch)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", help="Existing PDF to measure (default: generate one)")
+    parser.add_argument("--size-mb", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.input
+        if not source:
+            source = os.path.join(tmp, "input.pdf")
+            make_input(source, args.size_mb)
+        size_mb = os.path.getsize(source) / (1024 * 1024)
+        print(f"Input: {size_mb:.0f} MB\n")
+        print(f"{'operation':<10}{'input':<7}{'best time (s)':>15}{'MB/s':>10}{'peak RSS (MB)':>16}{'anon (MB)':>12}")
+
+        # Warm the OS page cache so both modes read from memory, not disk
+        measure("info", False, source, tmp)
+
+        for operation in OPERATIONS:
+            for name, use_mmap in MODES:
+                runs = [measure(operation, use_mmap, source, tmp) for _ in range(args.repeat)]
+                best = min(run["seconds"] for run in runs)
+                rss = max(run["peak_rss_mb"] or 0 for run in runs)
+                anon = max(run["anon_mb"] or 0 for run in runs)
+                rss_text = f"{rss:.0f}" if runs[0]["peak_rss_mb"] is not None else "n/a"
+                anon_text = f"{anon:.0f}" if runs[0]["anon_mb"] is not None else "n/a"
+                print(f"{operation:<10}{name:<7}{best:>15.3f}{size_mb / best:>10.0f}"
+                      f"{rss_text:>16}{anon_text:>12}")
+
+
+if __name__ == "__main__":
+    main()
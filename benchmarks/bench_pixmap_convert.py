@@ -0,0 +1,104 @@
+"""
+Benchmark: converting a rendered PyMuPDF pixmap into Qt images.
+
+Renders one dense A3 page once, then times only the conversion:
+
+    pixmap  copy       QPixmap from a QImage over bytes(pix.samples),
+                       the previous render_page() path
+            zero-copy  QPixmap from a QImage over pix.samples_mv
+                       (pixmap_to_qimage), as render_page() does now
+    image   copy       QImage over bytes(pix.samples), copied so it owns
+                       its pixels
+            zero-copy  pixmap_to_qimage(pix).copy(), as render_page_image()
+
+"py MB" is the peak Python-side allocation of one conversion (tracemalloc;
+Qt's own buffers are not counted): the bytes(pix.samples) copy.
+
+Usage:
+    python benchmarks/bench_pixmap_convert.py [--zoom 1.5] [--repeat 5] [--loops 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+A3 = (842, 1191)
+
+
+def dense_page_pixmap(zoom):
+    """A rendered A3 page full of vector text and lines."""
+    import pymupdf
+
+    doc = pymupdf.open()
+    page = doc.new_page(width=A3[0], height=A3[1])
+    for y in range(20, A3[1] - 20, 12):
+        page.draw_line((20, y), (A3[0] - 20, y + 6), color=(0.2, 0.4, 0.8), width=0.3)
+        page.insert_text((24, y + 10), f"Line {y} - the quick brown fox jumps over the lazy dog " * 2,
+                         fontsize=7)
+    pix = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom))
+    doc.close()
+    return pix
+
+
+def measure(convert, repeat, loops):
+    """(best seconds per conversion, peak Python MB of one conversion)."""
+    convert()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            convert()
+        best = min(best, (time.perf_counter() - start) / loops)
+    tracemalloc.start()
+    convert()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--zoom", type=float, default=1.5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--loops", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtGui import QImage, QPixmap
+    from PyQt6.QtWidgets import QApplication
+    from logic.pdf_renderer import pixmap_to_qimage
+
+    app = QApplication.instance() or QApplication([])
+    pix = dense_page_pixmap(args.zoom)
+    fmt = QImage.Format.Format_RGB888
+
+    def copied_image():
+        return QImage(bytes(pix.samples), pix.width, pix.height, pix.stride, fmt)
+
+    cases = [
+        ("pixmap", "copy", lambda: QPixmap.fromImage(copied_image())),
+        ("pixmap", "zero-copy", lambda: QPixmap.fromImage(pixmap_to_qimage(pix, fmt))),
+        ("image", "copy", lambda: copied_image().copy()),
+        ("image", "zero-copy", lambda: pixmap_to_qimage(pix, fmt).copy()),
+    ]
+
+    frame_mb = pix.stride * pix.height / (1024 * 1024)
+    print(f"A3 page at {args.zoom}x: {pix.width}x{pix.height} px, {frame_mb:.1f} MB per frame\n")
+    print(f"{'target':<8}{'path':<11}{'ms':>8}{'py MB':>8}")
+    times = {}
+    for target, path, convert in cases:
+        seconds, py_mb = measure(convert, args.repeat, args.loops)
+        times[target, path] = seconds
+        print(f"{target:<8}{path:<11}{seconds * 1000:>8.2f}{py_mb:>8.1f}")
+    for target in ("pixmap", "image"):
+        print(f"{target}: zero-copy is "
+              f"{times[target, 'copy'] / times[target, 'zero-copy']:.2f}x as fast")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: standard vs. tree merge of many small files, per engine.
+
+Generates --files one-page "receipts" (every third with a bookmark) and
+merges them in standard mode and in tree mode with --workers processes.
+Tree mode spreads the per-file work over the workers; its final pass
+copies every page once more on one core, so the gain depends on the
+core count and on how much of the merge is per-file overhead.
+
+Usage:
+    python benchmarks/bench_tree_merge.py [--files 5000] [--workers 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymupdf
+
+from logic.engines import ENGINES
+from logic.pdf_ops import PDFManager
+
+
+def make_receipts(folder, count):
+    paths = []
+    for index in range(count):
+        doc = pymupdf.open()
+        page = doc.new_page(width=300, height=500)
+        page.insert_text((30, 40), f"Receipt {index + 1}", fontsize=14)
+        for line in range(12):
+            page.insert_text((30, 80 + line * 20), f"Item {line + 1} ........ {line * 3 + 1}.99",
+                             fontsize=9)
+        if index % 3 == 0:
+            doc.set_toc([[1, f"Receipt {index + 1}", 1]])
+        path = os.path.join(folder, f"receipt_{index:06d}.pdf")
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_receipts(tmp, args.files)
+        print(f"{args.files} receipts, {args.workers} workers\n")
+        print(f"{'engine':<10}{'standard (s)':>14}{'tree (s)':>12}{'speedup':>10}")
+        for engine in ENGINES:
+            times = []
+            for mode in ("standard", "tree"):
+                manager = PDFManager(engine=engine)
+                start = time.perf_counter()
+                manager.merge_pdfs(paths, os.path.join(tmp, f"merged_{mode}.pdf"), mode=mode,
+                                   workers=args.workers, scratch_dir=tmp)
+                times.append(time.perf_counter() - start)
+            print(f"{engine:<10}{times[0]:>14.2f}{times[1]:>12.2f}{times[0] / times[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
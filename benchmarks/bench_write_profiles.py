@@ -0,0 +1,77 @@
+"""
+Benchmark: output size and write time of each write profile.
+
+Builds a synthetic input (text-heavy pages with uncompressed content
+streams, as many scanners and report generators produce), then splits and
+merges it once per profile.
+
+Usage:
+    python benchmarks/bench_write_profiles.py [--pages 500] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymupdf
+
+from logic.pdf_ops import PDFManager
+from logic.write_profiles import WRITE_PROFILES
+
+
+def make_input(path, pages):
+    doc = pymupdf.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        for line in range(40):
+            page.insert_text((50, 50 + line * 18), f"Page {page_num + 1} line {line} " * 4, fontsize=9)
+    # PyMuPDF compresses new content streams; expand them again
+    doc.save(path, expand=255)
+    doc.close()
+
+
+def folder_size(folder):
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    manager = PDFManager()
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "input.pdf")
+        make_input(source, args.pages)
+        print(f"Input: {args.pages} pages, {os.path.getsize(source) / 1e6:.2f} MB\n")
+        print(f"{'operation':<10}{'profile':<10}{'size (MB)':>12}{'best time (s)':>16}")
+
+        # Warm-up: parse the input once so the first profile isn't penalized
+        manager.get_pdf_info(source)
+
+        for profile in WRITE_PROFILES:
+            best = float("inf")
+            for _ in range(args.repeat):
+                out_dir = tempfile.mkdtemp(dir=tmp)
+                start = time.perf_counter()
+                manager.split_pdf(source, out_dir, profile=profile)
+                best = min(best, time.perf_counter() - start)
+            print(f"{'split':<10}{profile:<10}{folder_size(out_dir) / 1e6:>12.2f}{best:>16.3f}")
+
+        for profile in WRITE_PROFILES:
+            best = float("inf")
+            output = os.path.join(tmp, f"merged_{profile}.pdf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                manager.merge_pdfs([source, source, source], output, profile=profile)
+                best = min(best, time.perf_counter() - start)
+            print(f"{'merge':<10}{profile:<10}{os.path.getsize(output) / 1e6:>12.2f}{best:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
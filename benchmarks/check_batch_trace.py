@@ -0,0 +1,101 @@
+"""
+Check: a traced batch run records the jobs done in worker processes.
+
+Runs `main.py --trace FILE batch MANIFEST --workers N` (N > 1) on a few
+small synthetic PDFs, then `main.py --trace FILE info ... --workers N`,
+and collects the trace files: FILE from the main process and
+FILE.<pid>.json from each pool worker (see logic/tracing.py). The check
+fails unless every job shows up as a "batch.job" span and every probed
+file as an "info.probe" span.
+
+Usage:
+    python benchmarks/check_batch_trace.py [--workers 2] [--jobs 4]
+
+Exit code 0 if all spans are there, 1 otherwise.
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+
+def make_pdf(path, pages):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def traced_run(trace_path, arguments):
+    """Runs main.py with --trace and returns the span names of every trace file."""
+    subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "--trace", trace_path]
+                   + arguments, check=True, capture_output=True, text=True, cwd=ROOT)
+    root, ext = os.path.splitext(trace_path)
+    names = {}
+    for path in [trace_path] + sorted(glob.glob(f"{root}.*{ext}")):
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        names[os.path.basename(path)] = [e["name"] for e in events if e.get("ph") == "X"]
+    return names
+
+
+def count(names, span_name, worker_files_only=False):
+    return sum(spans.count(span_name) for file_name, spans in names.items()
+               if not worker_files_only or file_name.count(".") > 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as folder:
+        inputs = []
+        for index in range(args.jobs):
+            path = os.path.join(folder, f"input_{index}.pdf")
+            make_pdf(path, 5 + index)
+            inputs.append(path)
+        jobs = [{"op": "split", "input": path, "output": os.path.join(folder, f"out_{index}")}
+                for index, path in enumerate(inputs)]
+        manifest = os.path.join(folder, "jobs.json")
+        with open(manifest, "w", encoding="utf-8") as f:
+            json.dump(jobs, f)
+
+        names = traced_run(os.path.join(folder, "batch.json"),
+                           ["batch", manifest, "--workers", str(args.workers)])
+        jobs_traced = count(names, "batch.job", worker_files_only=True)
+        print(f"batch: {len(names)} trace files, {jobs_traced}/{args.jobs} jobs in worker traces")
+        if "batch.json" not in names:
+            failures.append("the main process wrote no trace file")
+        if jobs_traced != args.jobs:
+            failures.append(f"{jobs_traced} batch.job spans in worker traces, "
+                            f"expected {args.jobs}")
+
+        names = traced_run(os.path.join(folder, "info.json"),
+                           ["info", *inputs, "--workers", str(args.workers)])
+        probes = count(names, "info.probe", worker_files_only=True)
+        print(f"info: {len(names)} trace files, {probes}/{len(inputs)} probes in worker traces")
+        if probes != len(inputs):
+            failures.append(f"{probes} info.probe spans in worker traces, expected {len(inputs)}")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
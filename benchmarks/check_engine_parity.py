@@ -0,0 +1,128 @@
+"""
+Check: the pypdf and pymupdf engines produce equivalent documents.
+
+Splits and merges the same inputs with both engines and compares every
+output: page count, the text of each page (as PyMuPDF extracts it), page
+sizes, and for merges the outline (titles, levels and target pages). The
+bytes differ between engines; what a reader sees must not.
+
+Inputs are synthetic (see corpus.py), with a bookmark tree added so the
+outline handling is covered. Pass --inputs to check real files as well.
+
+Usage:
+    python benchmarks/check_engine_parity.py [--pages 60] [--inputs a.pdf b.pdf]
+
+Exit code 0 if every output matches, 1 otherwise.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import pymupdf
+
+from corpus import generate
+from logic.engines import ENGINES
+from logic.pdf_ops import PDFManager
+from logic.write_profiles import WRITE_PROFILES
+
+RANGES = (None, "1-3, 5, 10-", "odd", "every 7")
+
+
+def make_inputs(folder, pages):
+    """Two synthetic documents with nested bookmarks."""
+    paths = []
+    for index, spec in enumerate(({"images_per_page": 0, "fonts": 2, "text_lines": 30},
+                                  {"images_per_page": 1, "image_size": 120, "fonts": 1,
+                                   "text_lines": 10})):
+        path = os.path.join(folder, f"input_{index}.pdf")
+        generate(path, pages, seed=index, **spec)
+        doc = pymupdf.open(path)
+        toc = []
+        for page_num in range(0, pages, 10):
+            toc.append([1, f"Doc {index} chapter {page_num // 10 + 1}", page_num + 1])
+            if page_num + 5 < pages:
+                toc.append([2, f"Doc {index} section {page_num + 6}", page_num + 6])
+        doc.set_toc(toc)
+        doc.saveIncr()
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def describe(path):
+    """What a reader sees: pages (size and text) and the outline."""
+    with pymupdf.open(path) as doc:
+        pages = [(tuple(round(v, 1) for v in page.rect), page.get_text()) for page in doc]
+        return pages, doc.get_toc(simple=True)
+
+
+def compare(label, paths_by_engine, check_outline):
+    """Prints and returns the differences between the engines' outputs."""
+    problems = []
+    reference, other = (paths_by_engine[engine] for engine in ENGINES)
+    if [os.path.basename(p) for p in reference] != [os.path.basename(p) for p in other]:
+        problems.append("different output files")
+    for ref_path, other_path in zip(reference, other):
+        ref_pages, ref_toc = describe(ref_path)
+        other_pages, other_toc = describe(other_path)
+        name = os.path.basename(ref_path)
+        if len(ref_pages) != len(other_pages):
+            problems.append(f"{name}: {len(ref_pages)} vs {len(other_pages)} pages")
+            continue
+        for page_num, (ref_page, other_page) in enumerate(zip(ref_pages, other_pages), start=1):
+            if ref_page[0] != other_page[0]:
+                problems.append(f"{name} page {page_num}: size {ref_page[0]} vs {other_page[0]}")
+            if ref_page[1] != other_page[1]:
+                problems.append(f"{name} page {page_num}: text differs")
+        if check_outline and ref_toc != other_toc:
+            problems.append(f"{name}: outline differs ({len(ref_toc)} vs {len(other_toc)} entries)")
+    print(f"{'ok' if not problems else 'MISMATCH':<10}{label}")
+    for problem in problems[:10]:
+        print(f"          {problem}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--inputs", nargs="*", default=[], help="Additional PDFs to check")
+    args = parser.parse_args()
+
+    manager = PDFManager()
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = make_inputs(tmp, args.pages) + [os.path.abspath(p) for p in args.inputs]
+
+        for input_path in inputs:
+            for range_str in RANGES:
+                outputs = {}
+                for engine in ENGINES:
+                    out_dir = tempfile.mkdtemp(dir=tmp)
+                    outputs[engine] = manager.split_pdf(input_path, out_dir, range_str=range_str,
+                                                        engine=engine)
+                label = f"split {os.path.basename(input_path)} ranges={range_str!r}"
+                failures += bool(compare(label, outputs, check_outline=False))
+
+        for profile in WRITE_PROFILES:
+            for dedupe in (False, True):
+                outputs = {}
+                for engine in ENGINES:
+                    output = os.path.join(tempfile.mkdtemp(dir=tmp), "merged.pdf")
+                    manager.merge_pdfs(inputs, output, profile=profile, dedupe=dedupe,
+                                       engine=engine)
+                    outputs[engine] = [output]
+                label = f"merge profile={profile} dedupe={dedupe}"
+                failures += bool(compare(label, outputs, check_outline=True))
+
+    print(f"\n{failures} mismatching case(s)" if failures else "\nAll outputs match")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Check: the thumbnail grid asks for the pages that scroll into view at once.
+
+Opens a long synthetic document (--pages, default 2,500; generated once
+into the benchmark corpus folder) in the thumbnail grid, offscreen and
+without the on-disk cache, then jumps the scroll bar to a few positions
+across the document. After each jump, and one pass of the event loop,
+every page on screen must either be shown or have a render task queued.
+The suite (run_suite.py) only times the first screen, so a grid that
+stops reacting to scrolling passes there and fails here.
+
+Usage:
+    python benchmarks/check_grid_scroll.py [--pages 2500]
+
+Exit code 0 if every jump queued its visible pages, 1 otherwise.
+"""
+
+import argparse
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_CORPUS_DIR = os.path.join(BENCH_DIR, ".corpus")
+
+
+def document(corpus_dir, pages):
+    """A text document with two embedded fonts, generated on first use."""
+    from corpus import generate_corpus
+    spec = {"name": f"pages{pages}", "pages": pages, "images_per_page": 0, "image_size": 0,
+            "fonts": 2, "text_lines": 30, "text_block": True}
+    return generate_corpus(corpus_dir, [spec])[spec["name"]]
+
+
+def unrequested_pages(view):
+    """Pages on screen that are neither shown nor waiting for a render."""
+    first, last = view._visible_range()
+    queued = set().union(*view._task_pages.values())
+    return [page_num for page_num in range(first, last + 1)
+            if page_num not in view._model.pixmaps and page_num not in queued]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2500)
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from logic.pdf_renderer import PDFRenderer
+    from gui.preview import ThumbnailGridView
+
+    path = document(args.corpus_dir, args.pages)
+    app = QApplication.instance() or QApplication([])
+    renderer = PDFRenderer()
+    view = ThumbnailGridView(renderer)
+    view.thumbnail_cache = None
+    view.resize(900, 700)
+    view.show()
+    renderer.load_pdf(path)
+    view.load_thumbnails()
+    app.processEvents()
+
+    bar = view.verticalScrollBar()
+    positions = [bar.maximum() // 4, bar.maximum() // 2, bar.maximum(), 1, bar.maximum() // 3]
+    failures = 0
+    print(f"{'position':>10}{'visible':>10}{'not queued':>12}")
+    for position in positions:
+        bar.setValue(position)
+        app.processEvents()
+        first, last = view._visible_range()
+        missing = unrequested_pages(view)
+        failures += bool(missing)
+        print(f"{position:>10}{last - first + 1:>10}{len(missing):>12}")
+
+    view.shutdown()
+    renderer.close()
+    if failures:
+        print("FAILED: visible pages were not queued within one event loop pass")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Check: peak memory of a low-memory split stays flat as documents grow.
+
+Explodes synthetic text documents of --small and --large pages (default
+2,500 and 10,000; generated once into the benchmark corpus folder) into
+one file per page, each run in a fresh process, and reports the peak
+resident memory. The default split is measured alongside for comparison;
+it keeps every parsed object and grows by about 10 KB per page.
+
+Parsed objects no longer pile up in a low-memory split, but a little
+still grows with the document: pypdf's cross-reference table, the page
+index and the list of output paths split_pdf returns, together about
+1.5 KB per page. The check fails when the low-memory peak grows by more
+than --max-kb-per-page (default 2.5) between the two documents.
+
+Usage:
+    python benchmarks/check_split_memory.py [--large 10000] [--engine pypdf]
+
+Exit code 0 if the low-memory split stays within the limit, 1 otherwise.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_CORPUS_DIR = os.path.join(BENCH_DIR, ".corpus")
+
+
+def document(corpus_dir, pages):
+    """A text document with two embedded fonts, generated on first use."""
+    from corpus import generate_corpus
+    spec = {"name": f"pages{pages}", "pages": pages, "images_per_page": 0, "image_size": 0,
+            "fonts": 2, "text_lines": 30, "text_block": True}
+    return generate_corpus(corpus_dir, [spec])[spec["name"]]
+
+
+def run_child(path, low_memory, engine):
+    """Splits in this process and prints its peak memory as JSON."""
+    from logic.pdf_ops import PDFManager
+    from run_suite import peak_rss_mb
+
+    manager = PDFManager(engine=engine)
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        manager.split_pdf(path, out_dir, low_memory=low_memory)
+        seconds = time.perf_counter() - start
+    print(json.dumps({"peak_rss_mb": peak_rss_mb(), "seconds": seconds}))
+
+
+def measure(path, low_memory, engine):
+    command = [sys.executable, os.path.abspath(__file__), "--child", path, "--engine", engine]
+    if low_memory:
+        command.append("--low-memory")
+    output = subprocess.run(command, check=True, capture_output=True, text=True,
+                            cwd=ROOT).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--small", type=int, default=2500)
+    parser.add_argument("--large", type=int, default=10000)
+    parser.add_argument("--max-kb-per-page", type=float, default=2.5)
+    parser.add_argument("--engine", default="pypdf")
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--low-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.low_memory, args.engine)
+        return 0
+
+    print("Preparing documents (slow the first time)...")
+    paths = {pages: document(args.corpus_dir, pages) for pages in (args.small, args.large)}
+
+    print(f"\n{'split':<12}{'pages':>8}{'peak MB':>10}{'seconds':>10}")
+    peaks = {}
+    for low_memory in (False, True):
+        for pages, path in paths.items():
+            result = measure(path, low_memory, args.engine)
+            peaks[low_memory, pages] = result["peak_rss_mb"]
+            label = "low-memory" if low_memory else "default"
+            print(f"{label:<12}{pages:>8}{result['peak_rss_mb']:>10.0f}{result['seconds']:>10.1f}")
+
+    if peaks[True, args.small] is None:
+        print("\nPeak memory is not available on this platform")
+        return 0
+    extra_pages = args.large - args.small
+    growth = {low_memory: (peaks[low_memory, args.large] - peaks[low_memory, args.small])
+              * 1024 / extra_pages for low_memory in (False, True)}
+    print(f"\nPeak growth per extra page: default {growth[False]:.1f} KB, "
+          f"low-memory {growth[True]:.1f} KB (allowed: {args.max_kb_per_page} KB)")
+    if growth[True] > args.max_kb_per_page:
+        print("FAILED")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
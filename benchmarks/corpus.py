@@ -0,0 +1,138 @@
+"""
+Synthetic PDF corpus for the benchmarks.
+
+Documents are generated with PyMuPDF from a seed, so the same spec always
+gives the same bytes. A spec controls:
+    pages            number of pages
+    images_per_page  photos per page (random noise, so they don't compress)
+    image_size       width/height of each image in pixels
+    fonts            distinct embedded fonts, cycled over the text lines
+    text_lines       lines of text per page
+    text_block       optional: write each font's lines in one call instead of
+                     line by line (same kind of page, ~10x faster to generate;
+                     for documents with many thousands of pages)
+
+Usage (standalone):
+    python benchmarks/corpus.py OUT_FOLDER [--pages 200 --images 1 --fonts 2]
+"""
+
+import argparse
+import os
+import random
+
+import pymupdf
+
+# Fonts built into MuPDF; their data is embedded into the file with
+# insert_font(fontbuffer=...), unlike a plain reference to a Base-14 font
+EMBEDDABLE_FONTS = ("helv", "tiro", "cour", "hebo", "tibo", "cobo", "heit", "tiit")
+
+# The corpus the suite runs on. Small enough for a laptop run in a couple
+# of minutes, large enough that per-file overhead does not dominate.
+DEFAULT_SPECS = (
+    {"name": "text", "pages": 300, "images_per_page": 0, "image_size": 0, "fonts": 2,
+     "text_lines": 45},
+    {"name": "mixed", "pages": 100, "images_per_page": 1, "image_size": 300, "fonts": 3,
+     "text_lines": 20},
+    {"name": "scans", "pages": 30, "images_per_page": 1, "image_size": 1000, "fonts": 0,
+     "text_lines": 0},
+)
+
+
+def generate(path, pages, images_per_page=0, image_size=300, fonts=1, text_lines=30, seed=0,
+             text_block=False):
+    """
+    Writes one synthetic PDF.
+
+    Args:
+        path (str): Output file.
+        pages (int): Page count.
+        images_per_page (int): Incompressible RGB images per page.
+        image_size (int): Image width and height in pixels.
+        fonts (int): Distinct embedded fonts (0 uses the non-embedded Helvetica).
+        text_lines (int): Text lines per page.
+        seed (int): Random seed for the image data.
+        text_block (bool): One insert_text() call per font and page.
+    """
+    rng = random.Random(seed)
+    font_buffers = [pymupdf.Font(name).buffer
+                    for name in EMBEDDABLE_FONTS[:min(fonts, len(EMBEDDABLE_FONTS))]]
+    doc = pymupdf.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        font_names = []
+        for index, buffer in enumerate(font_buffers):
+            # Same font data on every page; PyMuPDF stores it once per file
+            page.insert_font(fontname=f"F{index}", fontbuffer=buffer)
+            font_names.append(f"F{index}")
+
+        if text_block:
+            # Each font's lines as one block, stacked down the page
+            names = font_names or ["helv"]
+            top = 40
+            for index, font_name in enumerate(names):
+                lines = [f"Page {page_num + 1} line {line + 1} - synthetic benchmark text"
+                         for line in range(index, text_lines, len(names))]
+                page.insert_text((40, top), "\n".join(lines), fontname=font_name, fontsize=9)
+                top += len(lines) * 16
+        else:
+            for line in range(text_lines):
+                font_name = font_names[line % len(font_names)] if font_names else "helv"
+                page.insert_text((40, 40 + line * 16),
+                                 f"Page {page_num + 1} line {line + 1} - synthetic benchmark text",
+                                 fontname=font_name, fontsize=9)
+
+        for index in range(images_per_page):
+            size = image_size * image_size * 3
+            samples = rng.getrandbits(size * 8).to_bytes(size, "little")
+            pix = pymupdf.Pixmap(pymupdf.csRGB, image_size, image_size, samples, False)
+            top = 60 + index * 20
+            page.insert_image(pymupdf.Rect(60, top, 540, top + 480), pixmap=pix)
+    doc.save(path, garbage=1, deflate=True)
+    doc.close()
+
+
+def generate_corpus(folder, specs=DEFAULT_SPECS, seed=0):
+    """
+    Generates every spec into folder (as <name>_<spec values>_s<seed>.pdf),
+    reusing files that are already there from an earlier run.
+
+    Returns:
+        dict: name -> path
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for spec in specs:
+        spec = dict(spec)
+        name = spec.pop("name")
+        # The spec is part of the file name so a changed spec regenerates
+        tag = "-".join(f"{value}" for value in spec.values())
+        path = os.path.join(folder, f"{name}_{tag}_s{seed}.pdf")
+        if not os.path.exists(path):
+            temp_path = path + ".tmp"
+            generate(temp_path, seed=seed, **spec)
+            os.replace(temp_path, path)
+        paths[name] = path
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic PDF")
+    parser.add_argument("output_folder")
+    parser.add_argument("--name", default="synthetic")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--images", type=int, default=1, help="Images per page")
+    parser.add_argument("--image-size", type=int, default=400)
+    parser.add_argument("--fonts", type=int, default=2)
+    parser.add_argument("--text-lines", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    spec = {"name": args.name, "pages": args.pages, "images_per_page": args.images,
+            "image_size": args.image_size, "fonts": args.fonts, "text_lines": args.text_lines}
+    paths = generate_corpus(args.output_folder, [spec], seed=args.seed)
+    for path in paths.values():
+        print(f"{path}\t{os.path.getsize(path) / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
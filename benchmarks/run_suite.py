@@ -0,0 +1,338 @@
+"""
+Benchmark suite: split, merge, page rendering and thumbnail loading on a
+synthetic corpus (see corpus.py), compared against a stored baseline.
+
+For every case it reports latency percentiles (per run for split/merge,
+per page for rendering, per grid load for thumbnails - until the pages
+on screen are shown, rendered or from a warm on-disk cache), throughput
+in pages per second and peak memory. Each case runs in a fresh process
+so peak memory belongs to that case alone.
+
+Typical use, e.g. around a pypdf or PyMuPDF upgrade:
+    python benchmarks/run_suite.py --save-baseline     # before
+    pip install -U pypdf pymupdf
+    python benchmarks/run_suite.py                     # after: exit 1 on regression
+
+A case regresses when its median latency grows, or its throughput drops,
+by more than --threshold (default 25%), or its peak memory grows by more
+than --memory-threshold (default 20%). Baselines are only comparable on
+the same machine; the suite warns when the baseline came from another one.
+
+Options:
+    --cases split,render_page   only run cases whose name starts with these
+    --repeat N                  measured runs per case (default 5)
+    --baseline PATH             default benchmarks/baseline.json
+    --corpus-dir DIR            default benchmarks/.corpus (generated once)
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_CORPUS_DIR = os.path.join(BENCH_DIR, ".corpus")
+
+# name -> (operation, corpus documents it runs on)
+CASES = {
+    "split/text": ("split", ["text"]),
+    "split/mixed": ("split", ["mixed"]),
+    "split/scans": ("split", ["scans"]),
+    "merge_standard/all": ("merge_standard", ["text", "mixed", "scans"]),
+    "merge_streaming/all": ("merge_streaming", ["text", "mixed", "scans"]),
+    "render_page/text": ("render_page", ["text"]),
+    "render_page/scans": ("render_page", ["scans"]),
+    "thumbnails/mixed": ("thumbnails", ["mixed"]),
+    "thumbnails_warm/mixed": ("thumbnails_warm", ["mixed"]),
+}
+
+
+# --- Measurements (run inside the child process) ----------------------------
+
+def _split(paths, scratch, repeat):
+    from logic.pdf_ops import PDFManager
+
+    manager = PDFManager()
+    for _ in range(repeat):
+        out_dir = tempfile.mkdtemp(dir=scratch)
+        start = time.perf_counter()
+        manager.split_pdf(paths[0], out_dir)
+        yield time.perf_counter() - start, manager.last_split_stats["pages"]
+
+
+def _merge(mode):
+    def run(paths, scratch, repeat):
+        from logic.pdf_ops import PDFManager
+
+        manager = PDFManager()
+        pages = sum(manager.get_pdf_info(path)["num_pages"] for path in paths)
+        # A cached reader would hide parsing cost in standard mode
+        manager.reader_cache.invalidate()
+        for index in range(repeat):
+            start = time.perf_counter()
+            manager.merge_pdfs(paths, os.path.join(scratch, f"merged_{index}.pdf"), mode=mode)
+            yield time.perf_counter() - start, pages
+            manager.reader_cache.invalidate()
+    return run
+
+
+def _qt_app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def _render_page(paths, scratch, repeat):
+    app = _qt_app()
+    from logic.pdf_renderer import PDFRenderer
+
+    renderer = PDFRenderer()
+    for _ in range(repeat):
+        # Reloading starts every pass cold
+        renderer.load_pdf(paths[0])
+        for page_num in range(renderer.get_page_count()):
+            start = time.perf_counter()
+            renderer.render_page(page_num, zoom=1.5)
+            yield time.perf_counter() - start, 1
+    renderer.close()
+    del app
+
+
+def _thumbnails(paths, scratch, repeat, warm=False):
+    app = _qt_app()
+    from logic.pdf_renderer import PDFRenderer
+    from logic.thumbnail_cache import ThumbnailCache
+    from gui.preview import ThumbnailGridView
+
+    renderer = PDFRenderer()
+    view = ThumbnailGridView(renderer)
+    # Cold: render every time. Warm: an on-disk cache in the scratch
+    # folder, which the warm-up run has filled
+    view.thumbnail_cache = ThumbnailCache(os.path.join(scratch, "thumbnails")) if warm else None
+    view.resize(900, 700)
+    view.show()
+    for _ in range(repeat):
+        renderer.load_pdf(paths[0])
+        start = time.perf_counter()
+        view.load_thumbnails()
+        # Thumbnails render in worker processes, and only for the pages on
+        # (and near) the screen; time until those are all shown
+        while view.is_loading():
+            app.processEvents()
+            time.sleep(0.001)
+        yield time.perf_counter() - start, view.rendered_count()
+        view.clear()
+        app.processEvents()
+    view.shutdown()
+    renderer.close()
+
+
+def _thumbnails_warm(paths, scratch, repeat):
+    return _thumbnails(paths, scratch, repeat, warm=True)
+
+
+OPERATIONS = {
+    "split": _split,
+    "merge_standard": _merge("standard"),
+    "merge_streaming": _merge("streaming"),
+    "render_page": _render_page,
+    "thumbnails": _thumbnails,
+    "thumbnails_warm": _thumbnails_warm,
+}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where unknown."""
+    # On Linux ru_maxrss survives exec (a child would report the parent's
+    # peak); VmHWM is this process's own
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(case, corpus_dir, repeat):
+    """Runs one case (plus a warm-up run) and prints its raw samples as JSON."""
+    from corpus import generate_corpus
+
+    operation, names = CASES[case]
+    corpus = generate_corpus(corpus_dir)
+    paths = [corpus[name] for name in names]
+    with tempfile.TemporaryDirectory() as scratch:
+        for _ in OPERATIONS[operation](paths, scratch, 1):
+            pass
+        samples = list(OPERATIONS[operation](paths, scratch, repeat))
+    print(json.dumps({"samples": samples, "peak_rss_mb": peak_rss_mb()}))
+
+
+# --- Suite (parent process) --------------------------------------------------
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples, peak_rss):
+    seconds = [sample[0] for sample in samples]
+    units = sum(sample[1] for sample in samples)
+    return {
+        "p50_ms": percentile(seconds, 50) * 1000,
+        "p90_ms": percentile(seconds, 90) * 1000,
+        "p99_ms": percentile(seconds, 99) * 1000,
+        "pages_per_second": units / sum(seconds) if sum(seconds) > 0 else 0.0,
+        "peak_rss_mb": peak_rss,
+        "samples": len(samples),
+    }
+
+
+def measure(case, corpus_dir, repeat):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", case,
+         "--corpus-dir", corpus_dir, "--repeat", str(repeat)],
+        check=True, capture_output=True, text=True, cwd=ROOT,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return summarize(result["samples"], result["peak_rss_mb"])
+
+
+def environment():
+    import pymupdf
+    import pypdf
+    return {
+        "machine": f"{platform.node()} {platform.machine()} {platform.system()}",
+        "python": platform.python_version(),
+        "pypdf": pypdf.__version__,
+        "pymupdf": pymupdf.VersionBind,
+    }
+
+
+def find_regressions(result, base, threshold, memory_threshold):
+    """Names of the metrics of one case that are worse than the baseline allows."""
+    regressions = []
+    if result["p50_ms"] > base["p50_ms"] * (1 + threshold):
+        regressions.append("p50")
+    if result["pages_per_second"] < base["pages_per_second"] / (1 + threshold):
+        regressions.append("throughput")
+    if (result["peak_rss_mb"] is not None and base.get("peak_rss_mb")
+            and result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + memory_threshold)):
+        regressions.append("memory")
+    return regressions
+
+
+def _change(value, base_value):
+    if not base_value or value is None:
+        return ""
+    return f"{(value / base_value - 1) * 100:+.0f}%"
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--child")
+        parser.add_argument("--corpus-dir")
+        parser.add_argument("--repeat", type=int)
+        args = parser.parse_args()
+        run_child(args.child, args.corpus_dir, args.repeat)
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", default="", help="Comma-separated case name prefixes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--memory-threshold", type=float, default=0.20)
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    args = parser.parse_args()
+
+    prefixes = [prefix.strip() for prefix in args.cases.split(",") if prefix.strip()]
+    cases = [case for case in CASES
+             if not prefixes or any(case.startswith(prefix) for prefix in prefixes)]
+    if not cases:
+        print(f"No case matches {args.cases!r}; cases: {', '.join(CASES)}", file=sys.stderr)
+        return 2
+
+    from corpus import generate_corpus
+    print("Preparing corpus...")
+    for name, path in generate_corpus(args.corpus_dir).items():
+        print(f"  {name:<8}{os.path.getsize(path) / 1e6:>8.1f} MB  {os.path.basename(path)}")
+
+    env = environment()
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        base_env = baseline.get("environment", {})
+        if base_env.get("machine") != env["machine"]:
+            print(f"Warning: baseline is from {base_env.get('machine')!r}, "
+                  f"this is {env['machine']!r}; timings may not be comparable")
+        changed = [f"{key} {base_env.get(key)} -> {env[key]}"
+                   for key in ("python", "pypdf", "pymupdf") if base_env.get(key) != env[key]]
+        if changed:
+            print("Changed since baseline: " + ", ".join(changed))
+
+    print(f"\n{'case':<22}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'pages/s':>10}"
+          f"{'peak MB':>9}{'vs baseline':>26}")
+    results = {}
+    failed = []
+    for case in cases:
+        try:
+            result = measure(case, args.corpus_dir, args.repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"{case:<22}ERROR\n{e.stderr}", file=sys.stderr)
+            failed.append(case)
+            continue
+        results[case] = result
+
+        note = ""
+        base = (baseline or {}).get("cases", {}).get(case)
+        if base:
+            regressions = find_regressions(result, base, args.threshold, args.memory_threshold)
+            note = (f"p50 {_change(result['p50_ms'], base['p50_ms'])} "
+                    f"mem {_change(result['peak_rss_mb'], base.get('peak_rss_mb'))}")
+            if regressions:
+                note += "  REGRESSED (" + ", ".join(regressions) + ")"
+                failed.append(case)
+        elif baseline is not None:
+            note = "new case"
+        peak = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{case:<22}{result['p50_ms']:>9.1f}{result['p90_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+              f"{result['pages_per_second']:>10.0f}{peak:>9}  {note}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": env, "repeat": args.repeat, "cases": results}, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+
+    if failed:
+        print(f"\nFAILED: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
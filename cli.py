@@ -0,0 +1,460 @@
+"""
+Headless command-line interface.
+
+Runs the split/merge logic from PDFManager without a display, e.g. on a
+server or in a scheduled job. Nothing in here (or in logic/pdf_ops.py)
+imports PyQt6, so it works on machines without Qt installed.
+
+Usage:
+    python main.py info FILE [FILE ...]
+    python main.py split INPUT -o FOLDER [--prefix P] [--ranges "1-3, 5" | --max-bytes 10M]
+    python main.py plan INPUT [--ranges ... | --max-bytes ...] [-o plan.json] [--shards N]
+    python main.py split INPUT -o FOLDER --plan plan.json [--shard 2/4]
+    python main.py merge INPUT [INPUT ...] -o OUTPUT [--mode streaming|tree]
+    python main.py batch MANIFEST [--workers N]
+
+Manifest format (JSON or CSV), one job per entry/row:
+    op      "split" or "merge"
+    input   split: source PDF. merge: list of PDFs (CSV: separated by ";")
+    output  split: output folder. merge: output file
+    prefix  optional, split only (default "split")
+    ranges  optional, split only (default: every page)
+    max_bytes optional, split only, instead of ranges: size limit per
+            output file, in bytes or with a K/M/G suffix ("9.5M")
+    plan    optional, split only, instead of prefix/ranges/max_bytes: a plan
+            file saved by the plan command
+    shard   optional, with plan: which part of it to run, "I/N" (1-based)
+    incremental optional, split only: skip outputs an earlier incremental
+            split already wrote and that are unchanged (true/false)
+    low_memory optional, split only: drop parsed objects after each output
+            file, for very large inputs (true/false)
+    mode    optional, merge only (default "standard")
+    scratch_dir optional, tree merge only: folder for intermediate files
+    dedupe  optional, merge only: share identical fonts/images (true/false)
+    profile optional write profile: fast (default), balanced or compact
+    mmap    optional: read inputs through a memory map (true/false)
+    fsync   optional: none (default), file or full - see logic/output_writer.py
+    engine  optional: pypdf (default) or pymupdf - see logic/engines.py
+JSON may be a list of jobs or {"jobs": [...]}. Relative paths are resolved
+against the manifest's folder.
+
+Exit codes:
+    0  every job succeeded
+    1  at least one job failed
+    2  bad command line or unreadable manifest
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+from logic import tracing
+from logic.engines import ENGINES
+from logic.output_writer import FSYNC_POLICIES
+from logic.pdf_ops import PDFManager
+from logic.split_plan import SplitPlan
+from logic.write_profiles import WRITE_PROFILES
+from version import __version__, __app_name__
+
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_USAGE = 2
+
+_SIZE_SUFFIXES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+# One PDFManager per process (and input mode), so worker processes keep
+# their reader cache across the jobs they are handed.
+_managers = {}
+
+
+def _get_manager(use_mmap=False, fsync_policy="none"):
+    key = (use_mmap, fsync_policy)
+    if key not in _managers:
+        _managers[key] = PDFManager(use_mmap=use_mmap, fsync_policy=fsync_policy)
+    return _managers[key]
+
+
+def run_job(job):
+    """
+    Runs one split or merge job and reports what it produced.
+    Never raises: failures are returned as status "failed" so one bad
+    input doesn't stop a batch. Module level so it can run in a process pool.
+    """
+    start_time = time.perf_counter()
+    result = {"job": job, "status": "ok", "pages": 0, "bytes": 0, "files": 0, "skipped": 0}
+    with tracing.span("batch.job", "cli", op=job.get("op")) as job_span:
+        try:
+            manager = _get_manager(_as_bool(job.get("mmap")), job.get("fsync") or "none")
+            op = job.get("op")
+            if op == "split":
+                os.makedirs(job["output"], exist_ok=True)
+                plan = None
+                if job.get("plan"):
+                    plan = SplitPlan.load(job["plan"])
+                    if job.get("shard"):
+                        plan = plan.shard(*parse_shard(job["shard"]))
+                created_files = manager.split_pdf(
+                    job["input"],
+                    job["output"],
+                    file_prefix=job.get("prefix") or "split",
+                    range_str=job.get("ranges") or None,
+                    workers=job.get("workers") or 1,
+                    profile=job.get("profile") or "fast",
+                    max_bytes=parse_size(job["max_bytes"]) if job.get("max_bytes") else None,
+                    engine=job.get("engine") or None,
+                    plan=plan,
+                    incremental=_as_bool(job.get("incremental")),
+                    low_memory=_as_bool(job.get("low_memory")),
+                )
+                # A shard of a plan may legitimately be empty
+                if not created_files and plan is None:
+                    raise ValueError("No valid pages selected")
+                stats = manager.last_split_stats
+                # Counts what this run wrote; kept files of an incremental split are skipped
+                result.update(pages=stats["pages"], files=stats["files"], bytes=stats["bytes"],
+                              skipped=stats["skipped"])
+            elif op == "merge":
+                output_path = manager.merge_pdfs(job["input"], job["output"],
+                                                 mode=job.get("mode") or "standard",
+                                                 dedupe=_as_bool(job.get("dedupe")),
+                                                 profile=job.get("profile") or "fast",
+                                                 engine=job.get("engine") or None,
+                                                 workers=job.get("workers") or None,
+                                                 scratch_dir=job.get("scratch_dir") or None)
+                info = manager.get_pdf_info_many([output_path], workers=1)[0]
+                result.update(pages=info.get("num_pages", 0), files=1,
+                              bytes=os.path.getsize(output_path))
+            else:
+                raise ValueError(f"Unknown op: {op!r}")
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+        job_span.set(status=result["status"], pages=result["pages"])
+    result["seconds"] = time.perf_counter() - start_time
+    tracing.save_in_worker()
+    return result
+
+
+def parse_size(value):
+    """
+    Parses a byte count like 5000000, "750K", "9.5M" or "1G" (powers of 1024).
+    Raises ValueError for anything else.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().upper()
+    if text.endswith("B"):
+        text = text[:-1]
+    factor = 1
+    if text[-1:] in _SIZE_SUFFIXES:
+        factor = _SIZE_SUFFIXES[text[-1]]
+        text = text[:-1]
+    try:
+        return int(float(text) * factor)
+    except ValueError:
+        raise ValueError(f"Invalid size: {value!r}") from None
+
+
+def parse_shard(value):
+    """
+    Parses "I/N" (shard I of N, 1-based) into a 0-based (index, count) pair.
+    Raises ValueError for anything else.
+    """
+    try:
+        index, count = (int(part) for part in str(value).split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard: {value!r} (expected e.g. 2/4)") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard: {value!r} (I must be between 1 and N)")
+    return index - 1, count
+
+
+def _shard_arg(value):
+    """argparse type: validates "I/N" but keeps the string for the job."""
+    try:
+        parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
+def _format_size(num_bytes):
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "bytes" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+def _as_bool(value):
+    """Manifest flags may be JSON booleans or CSV strings like "yes"/"1"."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def load_manifest(manifest_path):
+    """
+    Reads a JSON or CSV manifest (by file extension) into a list of jobs.
+    Raises ValueError if the file can't be understood.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    if manifest_path.lower().endswith(".csv"):
+        with open(manifest_path, newline="", encoding="utf-8") as f:
+            jobs = []
+            for row in csv.DictReader(f):
+                job = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+                if job.get("op") == "merge":
+                    job["input"] = [p.strip() for p in job.get("input", "").split(";") if p.strip()]
+                jobs.append(job)
+    else:
+        with open(manifest_path, encoding="utf-8") as f:
+            data = json.load(f)
+        jobs = data.get("jobs") if isinstance(data, dict) else data
+        if not isinstance(jobs, list):
+            raise ValueError("Manifest must be a list of jobs or {\"jobs\": [...]}")
+
+    for number, job in enumerate(jobs, start=1):
+        if not isinstance(job, dict) or job.get("op") not in ("split", "merge"):
+            raise ValueError(f"Job {number}: 'op' must be 'split' or 'merge'")
+        if not job.get("input") or not job.get("output"):
+            raise ValueError(f"Job {number}: 'input' and 'output' are required")
+        if job["op"] == "merge" and isinstance(job["input"], str):
+            job["input"] = [job["input"]]
+        # Make relative paths independent of the current working directory
+        if job["op"] == "merge":
+            job["input"] = [os.path.join(base_dir, p) for p in job["input"]]
+        else:
+            job["input"] = os.path.join(base_dir, job["input"])
+        job["output"] = os.path.join(base_dir, job["output"])
+        for key in ("plan", "scratch_dir"):
+            if job.get(key):
+                job[key] = os.path.join(base_dir, job[key])
+    return jobs
+
+
+@tracing.traced("batch", "cli")
+def run_jobs(jobs, workers=None):
+    """
+    Runs jobs on a process pool (or inline for workers=1), prints failures
+    as they happen and a summary at the end. Returns the exit code.
+    """
+    start_time = time.perf_counter()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    results = []
+    if workers == 1:
+        for job in jobs:
+            results.append(_report(run_job(job)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_job, job) for job in jobs]
+            for future in as_completed(futures):
+                results.append(_report(future.result()))
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    elapsed = time.perf_counter() - start_time
+    pages = sum(r["pages"] for r in results)
+    skipped = sum(r["skipped"] for r in results)
+    skipped_note = f" (+{skipped} unchanged, skipped)" if skipped else ""
+    print(
+        f"Jobs: {len(results) - failed} ok, {failed} failed | "
+        f"Pages: {pages} | Files: {sum(r['files'] for r in results)}{skipped_note} | "
+        f"Bytes written: {sum(r['bytes'] for r in results)} | "
+        f"Wall time: {elapsed:.2f}s ({pages / elapsed if elapsed > 0 else 0:.1f} pages/s)"
+    )
+    return EXIT_JOB_FAILED if failed else EXIT_OK
+
+
+def _report(result):
+    """Prints a failed job to stderr as soon as it finishes."""
+    if result["status"] != "ok":
+        job = result["job"]
+        print(f"FAILED {job.get('op')} {job.get('input')}: {result['error']}", file=sys.stderr)
+    return result
+
+
+def _cmd_info(args):
+    manager = _get_manager()
+    results = manager.get_pdf_info_many(args.files, workers=args.workers)
+    for info in results:
+        if info["valid"]:
+            print(f"{info['path']}\t{info['num_pages']} pages\t"
+                  f"{info['seconds'] * 1000:.1f} ms ({info['method']})")
+        else:
+            print(f"{info['path']}\tINVALID: {info['error']}", file=sys.stderr)
+    return EXIT_OK if all(info["valid"] for info in results) else EXIT_JOB_FAILED
+
+
+def _cmd_split(args):
+    if args.shard and not args.plan:
+        print("--shard needs --plan", file=sys.stderr)
+        return EXIT_USAGE
+    job = {"op": "split", "input": args.input, "output": args.output,
+           "prefix": args.prefix, "ranges": args.ranges, "workers": args.workers,
+           "max_bytes": args.max_bytes, "profile": args.profile, "mmap": args.mmap,
+           "fsync": args.fsync, "engine": args.engine, "plan": args.plan,
+           "shard": args.shard, "incremental": args.incremental,
+           "low_memory": args.low_memory}
+    return run_jobs([job], workers=1)
+
+
+def _cmd_plan(args):
+    manager = _get_manager()
+    try:
+        plan = manager.plan_split(args.input, file_prefix=args.prefix, range_str=args.ranges,
+                                  max_bytes=args.max_bytes, estimate_sizes=not args.no_estimate)
+    except Exception as e:
+        print(f"Cannot plan {args.input}: {type(e).__name__}: {e}", file=sys.stderr)
+        return EXIT_JOB_FAILED
+
+    if args.list:
+        sizes = plan.sizes or [None] * len(plan)
+        for (file_name, page_indices), size in zip(plan, sizes):
+            estimate = f"\t~{_format_size(size)}" if size is not None else ""
+            print(f"{file_name}\t{len(page_indices)} pages{estimate}")
+
+    summary = f"{plan.input_name}: {len(plan)} files, {plan.page_count()} pages"
+    if plan.sizes:
+        largest = max(range(len(plan.sizes)), key=plan.sizes.__getitem__)
+        largest_name = next(islice(plan, largest, None))[0]
+        summary += (f", ~{_format_size(plan.estimated_bytes())} on disk "
+                    f"(largest ~{_format_size(plan.sizes[largest])}: {largest_name})")
+    print(summary)
+    if plan.oversized:
+        print(f"{plan.oversized} file(s) hold a single page over the size limit")
+    for index in range(args.shards or 0):
+        shard = plan.shard(index, args.shards)
+        estimate = (f", ~{_format_size(shard.estimated_bytes())}"
+                    if shard.sizes is not None else "")
+        print(f"  shard {index + 1}/{args.shards}: {len(shard)} files, "
+              f"{shard.page_count()} pages{estimate}")
+
+    if args.output:
+        plan.save(args.output)
+        print(f"Plan saved to {args.output}")
+    return EXIT_OK
+
+
+def _cmd_merge(args):
+    job = {"op": "merge", "input": args.inputs, "output": args.output,
+           "mode": args.mode, "dedupe": args.dedupe, "profile": args.profile,
+           "mmap": args.mmap, "fsync": args.fsync, "engine": args.engine,
+           "workers": args.workers, "scratch_dir": args.scratch_dir}
+    return run_jobs([job], workers=1)
+
+
+def _cmd_batch(args):
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read manifest: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    return run_jobs(jobs, workers=args.workers)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description=f"{__app_name__} v{__version__} - headless batch mode",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    info = subparsers.add_parser("info", help="Print page counts")
+    info.add_argument("files", nargs="+")
+    info.add_argument("--workers", type=int, default=None,
+                      help="Worker processes (default: one per CPU)")
+    info.set_defaults(func=_cmd_info)
+
+    split = subparsers.add_parser("split", help="Split one PDF")
+    split.add_argument("input")
+    split.add_argument("-o", "--output", required=True, help="Output folder")
+    split.add_argument("--prefix", default="split")
+    ranges = split.add_mutually_exclusive_group()
+    _add_range_options(ranges)
+    ranges.add_argument("--plan", default=None,
+                        help="Write the outputs of a plan saved by the plan command")
+    split.add_argument("--shard", default=None, type=_shard_arg,
+                       help="With --plan: run only part I of N of it, e.g. 2/4")
+    split.add_argument("--incremental", action="store_true",
+                       help="Skip outputs that an earlier --incremental run already "
+                            "wrote and that are unchanged; rewrite only missing or stale ones")
+    split.add_argument("--low-memory", action="store_true",
+                       help="Keep memory flat on very large inputs by dropping parsed "
+                            "objects after each output file (slower)")
+    split.add_argument("--workers", type=int, default=1,
+                       help="Worker processes for this split (default: 1)")
+    split.add_argument("--profile", default="fast", choices=WRITE_PROFILES,
+                       help="Output size/speed trade-off (default: fast)")
+    split.add_argument("--mmap", action="store_true",
+                       help="Read inputs through a memory map (for very large files)")
+    split.add_argument("--fsync", default="none", choices=FSYNC_POLICIES,
+                       help="Flush outputs to disk before finishing (default: none)")
+    split.add_argument("--engine", default="pypdf", choices=ENGINES,
+                       help="Library that copies the pages (default: pypdf)")
+    split.set_defaults(func=_cmd_split)
+
+    plan = subparsers.add_parser("plan", help="Show (and save) what a split would write")
+    plan.add_argument("input")
+    plan.add_argument("-o", "--output", default=None, help="Save the plan as JSON")
+    plan.add_argument("--prefix", default="split")
+    _add_range_options(plan.add_mutually_exclusive_group())
+    plan.add_argument("--list", action="store_true", help="Print every planned file")
+    plan.add_argument("--shards", type=int, default=None,
+                      help="Also show how the plan divides into N shards")
+    plan.add_argument("--no-estimate", action="store_true",
+                      help="Skip size estimates (faster for huge inputs)")
+    plan.set_defaults(func=_cmd_plan)
+
+    merge = subparsers.add_parser("merge", help="Merge PDFs into one")
+    merge.add_argument("inputs", nargs="+")
+    merge.add_argument("-o", "--output", required=True, help="Output file")
+    merge.add_argument("--mode", default="standard", choices=PDFManager.MERGE_MODES,
+                       help="tree: merge chunks of a long input list in parallel")
+    merge.add_argument("--workers", type=int, default=None,
+                       help="Worker processes for --mode tree (default: one per CPU)")
+    merge.add_argument("--scratch-dir", default=None,
+                       help="Folder for --mode tree's intermediate files "
+                            "(default: system temp folder)")
+    merge.add_argument("--dedupe", action="store_true",
+                       help="Store identical fonts, images and color profiles once")
+    merge.add_argument("--profile", default="fast", choices=WRITE_PROFILES,
+                       help="Output size/speed trade-off (default: fast)")
+    merge.add_argument("--mmap", action="store_true",
+                       help="Read inputs through a memory map (for very large files)")
+    merge.add_argument("--fsync", default="none", choices=FSYNC_POLICIES,
+                       help="Flush outputs to disk before finishing (default: none)")
+    merge.add_argument("--engine", default="pypdf", choices=ENGINES,
+                       help="Library that copies the pages (default: pypdf; "
+                            "streaming mode needs pypdf)")
+    merge.set_defaults(func=_cmd_merge)
+
+    batch = subparsers.add_parser("batch", help="Run a JSON or CSV job manifest")
+    batch.add_argument("manifest")
+    batch.add_argument("--workers", type=int, default=None,
+                       help="Worker processes (default: one per CPU)")
+    batch.set_defaults(func=_cmd_batch)
+
+    return parser
+
+
+def _add_range_options(group):
+    """--ranges / --max-bytes, shared by split and plan."""
+    group.add_argument("--ranges", default=None,
+                       help="e.g. \"1-3, 5\", \"odd\", \"every 10\" (default: every page)")
+    group.add_argument("--max-bytes", default=None, type=parse_size,
+                       help="Pack consecutive pages into files of at most this size, "
+                            "e.g. 9.5M (files over it hold a single page)")
+
+
+def run_cli(argv):
+    """Parses argv (without the program name) and returns an exit code."""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -1,7 +1,9 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                             QPushButton, QScrollArea, QGridLayout, QStackedWidget)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListView,
+                             QPushButton, QScrollArea, QStackedWidget, QStyledItemDelegate)
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, QPoint, QRect, QSize, Qt, QTimer
+from PyQt6.QtGui import QImage, QPalette, QPixmap
+from logic import tracing
+from logic.thumbnail_cache import FingerprintCache, ThumbnailCache
 
 class SinglePageView(QWidget):
     """Displays one PDF page with navigation controls"""
@@ -47,9 +49,10 @@ class SinglePageView(QWidget):
 
         layout.addLayout(nav_layout)
 
+    @tracing.traced("preview.page", "gui")
     def set_page(self, page_num):
         """Load and display specific page"""
-        if not self.renderer.current_doc:
+        if not self.renderer.has_document():
             return
 
         page_count = self.renderer.get_page_count()
@@ -97,69 +100,316 @@ class SinglePageView(QWidget):
         self.current_page = 0
 
 
-class ThumbnailGridView(QScrollArea):
-    """Displays all pages as thumbnail grid"""
+class ThumbnailModel(QAbstractListModel):
+    """
+    One row per page. Holds the thumbnails rendered so far; pages without
+    one are drawn as placeholders by ThumbnailDelegate.
+    """
+
+    # True for a page whose thumbnail failed to render
+    FAILED_ROLE = Qt.ItemDataRole.UserRole
+
+    def __init__(self):
+        super().__init__()
+        self._page_count = 0
+        # page number -> QPixmap
+        self.pixmaps = {}
+        self.failed = set()
+
+    def reset(self, page_count):
+        """Starts over with page_count placeholder pages"""
+        self.beginResetModel()
+        self._page_count = page_count
+        self.pixmaps = {}
+        self.failed = set()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._page_count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        page_num = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"Page {page_num + 1}"
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.pixmaps.get(page_num)
+        if role == self.FAILED_ROLE:
+            return page_num in self.failed
+        return None
+
+    def set_pixmap(self, page_num, pixmap):
+        self.pixmaps[page_num] = pixmap
+        self._changed(page_num)
+
+    def set_failed(self, page_num):
+        self.failed.add(page_num)
+        self._changed(page_num)
+
+    def evict(self, keep):
+        """Drops the thumbnails of pages outside `keep` (a range)"""
+        for page_num in [page_num for page_num in self.pixmaps if page_num not in keep]:
+            del self.pixmaps[page_num]
+
+    def _changed(self, page_num):
+        index = self.index(page_num)
+        self.dataChanged.emit(index, index)
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Paints one grid cell: the thumbnail (or a placeholder) over its page label"""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+
+    def sizeHint(self, option, index):
+        return self.view.gridSize()
+
+    def paint(self, painter, option, index):
+        painter.save()
+        cell = option.rect.adjusted(self.view.SPACING // 2, self.view.SPACING // 2,
+                                    -self.view.SPACING // 2, -self.view.SPACING // 2)
+        image_rect = QRect(cell.x(), cell.y(), cell.width(),
+                           cell.height() - self.view.LABEL_HEIGHT)
+        label_rect = QRect(cell.x(), image_rect.bottom() + 1, cell.width(),
+                           self.view.LABEL_HEIGHT)
+
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None:
+            # Rendered at the cell width; only unusually tall pages shrink
+            size = pixmap.size()
+            if size.height() > image_rect.height():
+                size = size.scaled(image_rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRect(QPoint(0, 0), size)
+            target.moveCenter(image_rect.center())
+            painter.drawPixmap(target, pixmap)
+            # A frame, so white pages stand out from the background
+            painter.setPen(option.palette.color(QPalette.ColorRole.Mid))
+            painter.drawRect(target.adjusted(0, 0, -1, -1))
+        else:
+            failed = index.data(ThumbnailModel.FAILED_ROLE)
+            painter.setPen(option.palette.color(QPalette.ColorRole.Mid))
+            painter.drawRect(image_rect.adjusted(0, 0, -1, -1))
+            painter.drawText(image_rect, Qt.AlignmentFlag.AlignCenter,
+                             "Error rendering page" if failed else "Loading...")
+
+        painter.setPen(option.palette.color(QPalette.ColorRole.Text))
+        painter.drawText(label_rect, Qt.AlignmentFlag.AlignCenter,
+                         index.data(Qt.ItemDataRole.DisplayRole))
+        painter.restore()
+
+
+class ThumbnailGridView(QListView):
+    """
+    Displays all pages as thumbnail grid.
+
+    A virtualized model/view grid: cells are painted by a delegate, so no
+    widget exists per page, and the columns reflow with the width of the
+    view. Only the pages on screen (and one screen ahead) are rendered, in
+    worker processes (logic/render_service.py), visible pages first;
+    thumbnails more than KEEP_SCREENS screens away are dropped again and
+    re-rendered if they come back. Loading another document (or clear())
+    cancels what is still queued.
+
+    Rendered thumbnails are also kept on disk (thumbnail_cache, see
+    logic/thumbnail_cache.py). Pages found there are shown straight away,
+    so a document opened before fills its grid without starting a render.
+    Set thumbnail_cache to None before the first load_thumbnails() to
+    always render.
+    """
+
+    THUMBNAIL_WIDTH = 200
+    # Room for an A4 portrait page at THUMBNAIL_WIDTH
+    THUMBNAIL_HEIGHT = 283
+    LABEL_HEIGHT = 20
+    SPACING = 10
+    # Pages rendered ahead of the viewport, and thumbnails kept around it, in screens
+    PREFETCH_SCREENS = 1
+    KEEP_SCREENS = 3
 
     def __init__(self, renderer):
         super().__init__()
         self.renderer = renderer
 
-        # Make scrollable
-        self.setWidgetResizable(True)
-
-        # Container widget
-        self.container = QWidget()
-        self.grid_layout = QGridLayout(self.container)
-        self.grid_layout.setSpacing(10)
-
-        self.setWidget(self.container)
-
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setGridSize(QSize(self.THUMBNAIL_WIDTH + self.SPACING,
+                               self.THUMBNAIL_HEIGHT + self.LABEL_HEIGHT + self.SPACING))
+
+        self._model = ThumbnailModel()
+        self.setModel(self._model)
+        self.setItemDelegate(ThumbnailDelegate(self))
+
+        # Render worker processes, started with the first grid
+        self._bridge = None
+        self.thumbnail_cache = ThumbnailCache()
+        # Content fingerprints of the documents, for thumbnail_cache
+        self._fingerprints = FingerprintCache()
+        # Render task -> pages waiting for it (a merge may list a file twice)
+        self._task_pages = {}
+        # Scrolling and resizing fire often; update once per event loop pass
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(0)
+        self._update_timer.timeout.connect(self._update_visible)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_update)
+
+    @tracing.traced("preview.thumbnails", "gui")
     def load_thumbnails(self):
-        """Generate and display all page thumbnails"""
+        """Show a grid of every page and render the visible thumbnails"""
         # Clear existing thumbnails
         self.clear()
 
-        if not self.renderer.current_doc:
+        if not self.renderer.has_document():
             return
 
-        page_count = self.renderer.get_page_count()
-
-        # Generate thumbnails in a 4-column grid
-        columns = 4
-
-        for page_num in range(page_count):
-            # Create container for thumbnail and label
-            thumb_widget = QWidget()
-            thumb_layout = QVBoxLayout(thumb_widget)
-            thumb_layout.setContentsMargins(0, 0, 0, 0)
-
-            # Render thumbnail
-            pixmap = self.renderer.render_thumbnail(page_num, max_width=200)
-
-            if pixmap:
-                # Create label for thumbnail image
-                img_label = QLabel()
-                img_label.setPixmap(pixmap)
-                img_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                thumb_layout.addWidget(img_label)
-
-                # Create label for page number
-                page_label = QLabel(f"Page {page_num + 1}")
-                page_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                thumb_layout.addWidget(page_label)
-
-                # Add to grid
-                row = page_num // columns
-                col = page_num % columns
-                self.grid_layout.addWidget(thumb_widget, row, col)
+        self._model.reset(self.renderer.get_page_count())
+        # A new document starts at the top (the view may still hold the old offset)
+        self.scrollToTop()
+        self._update_visible()
+
+    def is_loading(self):
+        """True while requested thumbnails are still being rendered"""
+        return bool(self._task_pages)
+
+    def rendered_count(self):
+        """Thumbnails currently held by the grid"""
+        return len(self._model.pixmaps)
+
+    def resizeEvent(self, event):
+        # The view reflows the columns; only newly exposed pages need rendering
+        super().resizeEvent(event)
+        self._schedule_update()
+
+    def _schedule_update(self, *_):
+        # Not connected to QTimer.start directly: valueChanged(int) would
+        # pass the scroll position as the interval in milliseconds
+        self._update_timer.start(0)
+
+    def _visible_range(self):
+        """First and last page on screen (cells are laid out on gridSize())"""
+        grid = self.gridSize()
+        columns = max(1, self.viewport().width() // grid.width())
+        top = self.verticalOffset()
+        first = top // grid.height() * columns
+        last = ((top + self.viewport().height()) // grid.height() + 1) * columns - 1
+        return first, min(last, self._model.rowCount() - 1)
+
+    def _update_visible(self):
+        """Render what is (about to be) on screen; forget what is far away"""
+        page_count = self._model.rowCount()
+        if not page_count:
+            return
+        first, last = self._visible_range()
+        screen = last - first + 1
+        ahead = screen * self.PREFETCH_SCREENS
+        wanted = range(max(0, first - ahead), min(page_count, last + 1 + ahead))
+
+        # Queued renders of pages that scrolled out of reach
+        stale = [task for task, pages in self._task_pages.items()
+                 if not any(page_num in wanted for page_num in pages)]
+        if self._bridge is not None:
+            self._bridge.discard(stale)
+        for task in stale:
+            del self._task_pages[task]
+
+        # Visible pages first, then the ones below, then those above
+        order = (list(range(first, last + 1)) + list(range(last + 1, wanted.stop))
+                 + list(range(first - 1, wanted.start - 1, -1)))
+        new_tasks = []
+        visible_tasks = []
+        # Fingerprint per file, looked up once per pass
+        fingerprints = {}
+        for page_num in order:
+            if page_num in self._model.pixmaps or page_num in self._model.failed:
+                continue
+            path, source_page = self.renderer.page_source(page_num)
+            task = (path, source_page, self.THUMBNAIL_WIDTH)
+            if task not in self._task_pages:
+                # Seen before: shown at once, without waiting for the workers
+                if path not in fingerprints:
+                    fingerprints[path] = self._fingerprint(path)
+                pixmap = self._cached_thumbnail(fingerprints[path], source_page)
+                if pixmap is not None:
+                    self._model.set_pixmap(page_num, pixmap)
+                    continue
+                self._task_pages[task] = set()
+                new_tasks.append(task)
+            self._task_pages[task].add(page_num)
+            if page_num <= last:
+                visible_tasks.append(task)
+        if new_tasks or visible_tasks:
+            bridge = self._get_bridge()
+            bridge.submit(new_tasks)
+            # Renders queued for an earlier scroll position that are now on screen
+            bridge.prioritize(visible_tasks)
+
+        keep = screen * self.KEEP_SCREENS
+        self._model.evict(range(first - keep, last + 1 + keep))
+
+    def _fingerprint(self, path):
+        """Content fingerprint of path for thumbnail_cache, or None"""
+        if self.thumbnail_cache is None:
+            return None
+        try:
+            return self._fingerprints.get(path)
+        except OSError:
+            return None
+
+    def _cached_thumbnail(self, fingerprint, source_page):
+        """A page's thumbnail from the on-disk cache, or None"""
+        if fingerprint is None:
+            return None
+        png = self.thumbnail_cache.get(fingerprint, source_page, self.THUMBNAIL_WIDTH)
+        if png is None:
+            return None
+        # An unreadable entry is left to the workers, which render it again
+        image = QImage.fromData(png, "PNG")
+        return None if image.isNull() else QPixmap.fromImage(image)
+
+    def _get_bridge(self):
+        if self._bridge is None:
+            from gui.workers import RenderServiceBridge
+            self._bridge = RenderServiceBridge(thumbnail_cache=self.thumbnail_cache,
+                                               parent=self)
+            self._bridge.rendered.connect(self._on_rendered)
+            self._bridge.failed.connect(self._on_failed)
+        return self._bridge
+
+    def _on_rendered(self, task, result):
+        # None if left over from another document or scrolled away meanwhile
+        pages = self._task_pages.pop(task, None)
+        if pages is None:
+            return
+        width, height, stride, samples = result
+        pixmap = QPixmap.fromImage(QImage(samples, width, height, stride,
+                                          QImage.Format.Format_RGB888))
+        for page_num in pages:
+            self._model.set_pixmap(page_num, pixmap)
+
+    def _on_failed(self, task, message):
+        pages = self._task_pages.pop(task, None)
+        if pages is None:
+            return
+        print(f"Error rendering thumbnail: {message}")
+        for page_num in pages:
+            self._model.set_failed(page_num)
 
     def clear(self):
-        """Remove all thumbnails from grid"""
-        # Remove all widgets from layout
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        """Remove all thumbnails from grid (and cancel pending renders)"""
+        if self._bridge is not None:
+            self._bridge.cancel()
+        self._task_pages = {}
+        self._model.reset(0)
+
+    def shutdown(self):
+        """Stop the render worker processes (on exit)"""
+        if self._bridge is not None:
+            self._bridge.shutdown()
 
 
 class PreviewWidget(QWidget):
@@ -203,11 +453,18 @@ class PreviewWidget(QWidget):
         # Start with single page view
         self.stacked_widget.setCurrentIndex(0)
 
+    @tracing.traced("preview.refresh", "gui")
     def load_pdf(self, file_path):
         """Load new PDF for preview"""
         # Load PDF in renderer
-        success = self.renderer.load_pdf(file_path)
+        self._show_loaded(self.renderer.load_pdf(file_path))
 
+    @tracing.traced("preview.refresh", "gui")
+    def load_documents(self, file_paths):
+        """Preview several PDFs as one merged document, without merging them"""
+        self._show_loaded(self.renderer.load_documents(file_paths))
+
+    def _show_loaded(self, success):
         if success:
             # Load single page view (page 0)
             self.single_view.set_page(0)
@@ -232,7 +489,7 @@ class PreviewWidget(QWidget):
             self.toggle_btn.setText("Show Single Page")
 
             # Load thumbnails if not already loaded
-            if not self.thumbnails_loaded and self.renderer.current_doc:
+            if not self.thumbnails_loaded and self.renderer.has_document():
                 self.thumbnail_view.load_thumbnails()
                 self.thumbnails_loaded = True
         else:
@@ -240,6 +497,10 @@ class PreviewWidget(QWidget):
             self.stacked_widget.setCurrentIndex(0)
             self.toggle_btn.setText("Show Thumbnail Grid")
 
+    def shutdown(self):
+        """Stop background rendering (on exit)"""
+        self.thumbnail_view.shutdown()
+
     def clear(self):
         """Clear preview (when no file selected)"""
         self.single_view.clear()
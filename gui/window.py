@@ -1,13 +1,15 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QTabWidget,
                              QLabel, QPushButton, QFileDialog, QHBoxLayout,
                              QListWidget, QMessageBox, QLineEdit, QListWidgetItem,
-                             QAbstractItemView)
+                             QAbstractItemView, QProgressDialog)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon
 from logic.pdf_ops import PDFManager
+from logic import tracing
+from logic.page_ranges import PageRangeError
+from gui.workers import PDFTaskWorker, start_task
 from version import __version__, __app_name__
 import os
-import tempfile
 import sys
 
 class MainWindow(QMainWindow):
@@ -29,12 +31,18 @@ class MainWindow(QMainWindow):
         self.manager = PDFManager()
         self.current_split_file = None
 
+        # Background split/merge job (only one at a time)
+        self._task_thread = None
+        self._task_worker = None
+        self._task_dialog = None
+        self._task_on_finished = None
+        self._task_error_prefix = None
+
         # Initialize PDF Renderer for preview
         from logic.pdf_renderer import PDFRenderer
         self.split_renderer = PDFRenderer()
         self.merge_renderer = PDFRenderer()
 
-        self._merge_preview_temp_path = None
         self._merge_preview_update_timer = QTimer(self)
         self._merge_preview_update_timer.setSingleShot(True)
         self._merge_preview_update_timer.setInterval(250)
@@ -114,7 +122,7 @@ class MainWindow(QMainWindow):
         range_label = QLabel("Optional: Enter Page Ranges (e.g. '1-3, 5'). Leave empty to split all pages.")
         controls_layout.addWidget(range_label)
         self.range_input = QLineEdit()
-        self.range_input.setPlaceholderText("e.g. 1-5, 8, 10-12")
+        self.range_input.setPlaceholderText("e.g. 1-5, 8, 10-, odd, every 10")
         controls_layout.addWidget(self.range_input)
 
         # Custom filename input
@@ -171,39 +179,53 @@ class MainWindow(QMainWindow):
         """Executes the split operation"""
         if not self.current_split_file:
             return
-            
+
+        range_str = self.range_input.text().strip()
+        if range_str:
+            # Catch typos before asking for a folder; the error names the position
+            try:
+                self.manager.parse_page_groups(range_str, self.split_renderer.get_page_count())
+            except PageRangeError as e:
+                QMessageBox.warning(self, "Invalid Page Range", str(e))
+                self.range_input.setFocus()
+                self.range_input.setCursorPosition(e.position)
+                return
+
         # Ask user where to save
         output_folder = QFileDialog.getExistingDirectory(self, "Select Output Folder")
         if not output_folder:
             return
 
-        range_str = self.range_input.text().strip()
-
         # Get custom filename prefix
         custom_prefix = self.filename_input.text().strip()
         if not custom_prefix:
             custom_prefix = "split"  # Default
 
-        try:
-            # Call our logic class
-            created_files = self.manager.split_pdf(
-                self.current_split_file,
-                output_folder,
-                file_prefix=custom_prefix,
-                range_str=range_str if range_str else None
-            )
-            
-            if not created_files and range_str:
-                QMessageBox.warning(self, "Warning", "No files created. Check your page range.")
-                return
-            
-            QMessageBox.information(
-                self, 
-                "Success", 
-                f"Successfully created {len(created_files)} files in:\n{output_folder}"
-            )
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred:\n{str(e)}")
+        # Runs on a worker thread; the window stays responsive meanwhile
+        worker = PDFTaskWorker(
+            self.manager.split_pdf,
+            self.current_split_file,
+            output_folder,
+            file_prefix=custom_prefix,
+            range_str=range_str if range_str else None
+        )
+        self._run_task(
+            worker,
+            "Splitting PDF...",
+            lambda created_files: self._split_finished(created_files, range_str, output_folder),
+            "An error occurred",
+        )
+
+    def _split_finished(self, created_files, range_str, output_folder):
+        if not created_files and range_str:
+            QMessageBox.warning(self, "Warning", "No files created. Check your page range.")
+            return
+
+        QMessageBox.information(
+            self, 
+            "Success", 
+            f"Successfully created {len(created_files)} files in:\n{output_folder}"
+        )
 
     def create_merge_tab(self):
         """Setup the UI for the Merge tab"""
@@ -320,11 +342,73 @@ class MainWindow(QMainWindow):
         if not output_file:
             return
             
-        try:
-            self.manager.merge_pdfs(input_paths, output_file)
-            QMessageBox.information(self, "Success", f"Merged PDF saved to:\n{output_file}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to merge:\n{str(e)}")
+        worker = PDFTaskWorker(self.manager.merge_pdfs, input_paths, output_file)
+        self._run_task(
+            worker,
+            "Merging PDFs...",
+            lambda _: QMessageBox.information(self, "Success", f"Merged PDF saved to:\n{output_file}"),
+            "Failed to merge",
+        )
+
+    def _run_task(self, worker, label, on_finished, error_prefix):
+        """
+        Runs a PDFTaskWorker in the background behind a window-modal
+        progress dialog. The Cancel button stops the job at the next page
+        boundary; PDFManager removes any partial output.
+        """
+        if self._task_thread is not None:
+            return
+
+        dialog = QProgressDialog(label, "Cancel", 0, 0, self)
+        dialog.setWindowTitle(__app_name__)
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)  # Don't flash a dialog for tiny jobs
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.canceled.connect(worker.cancel)
+
+        self._task_worker = worker
+        self._task_dialog = dialog
+        self._task_on_finished = on_finished
+        self._task_error_prefix = error_prefix
+
+        # Bound methods (not lambdas) so Qt queues the calls onto this thread
+        worker.progress.connect(self._on_task_progress)
+        worker.finished.connect(self._on_task_finished)
+        worker.failed.connect(self._on_task_failed)
+        worker.cancelled.connect(self._on_task_cancelled)
+
+        self._task_thread = start_task(self, worker)
+
+    def _on_task_progress(self, done, total):
+        if self._task_dialog is None or self._task_dialog.wasCanceled():
+            return
+        self._task_dialog.setMaximum(total)
+        self._task_dialog.setValue(done)
+
+    def _on_task_finished(self, result):
+        on_finished = self._task_on_finished
+        self._end_task()
+        on_finished(result)
+
+    def _on_task_failed(self, message):
+        prefix = self._task_error_prefix
+        self._end_task()
+        QMessageBox.critical(self, "Error", f"{prefix}:\n{message}")
+
+    def _on_task_cancelled(self):
+        self._end_task()
+        QMessageBox.information(self, "Cancelled", "Operation cancelled. Partial output was removed.")
+
+    def _end_task(self):
+        if self._task_dialog is not None:
+            self._task_dialog.close()
+            self._task_dialog.deleteLater()
+        self._task_thread = None
+        self._task_worker = None
+        self._task_dialog = None
+        self._task_on_finished = None
+        self._task_error_prefix = None
 
     def toggle_theme(self):
         """Toggle between light and dark themes"""
@@ -347,45 +431,27 @@ class MainWindow(QMainWindow):
                 paths.append(path)
         return paths
 
+    @tracing.traced("merge_preview.refresh", "gui")
     def _update_merge_preview_now(self):
         paths = self._merge_list_paths_in_order()
         if not paths:
             self.merge_preview.clear()
-            self._cleanup_merge_preview_temp_file()
-            return
-
-        if len(paths) == 1:
-            self.merge_preview.load_pdf(paths[0])
-            self._cleanup_merge_preview_temp_file()
+            self.merge_renderer.close()
             return
 
-        fd, temp_path = tempfile.mkstemp(prefix="merge_preview_", suffix=".pdf")
-        os.close(fd)
-
-        try:
-            self.manager.merge_pdfs(paths, temp_path)
-            old_path = self._merge_preview_temp_path
-            self._merge_preview_temp_path = temp_path
-            self.merge_preview.load_pdf(temp_path)
-            if old_path:
-                self._try_remove_file(old_path)
-        except Exception:
-            self._try_remove_file(temp_path)
-            self.merge_preview.clear()
-
-    def _cleanup_merge_preview_temp_file(self):
-        if self._merge_preview_temp_path:
-            self._try_remove_file(self._merge_preview_temp_path)
-            self._merge_preview_temp_path = None
-
-    def _try_remove_file(self, path):
-        try:
-            os.remove(path)
-        except OSError:
-            pass
+        # The preview renders straight from the source files through a page
+        # index, so adding or reordering files never merges or writes anything
+        self.merge_preview.load_documents(paths)
 
     def closeEvent(self, event):
-        self._cleanup_merge_preview_temp_file()
+        # Stop a running job cleanly instead of killing its thread
+        if self._task_thread is not None:
+            self._task_worker.cancel()
+            self._task_thread.wait()
+        self.split_preview.shutdown()
+        self.merge_preview.shutdown()
+        self.split_renderer.close()
+        self.merge_renderer.close()
         super().closeEvent(event)
 
     def dragEnterEvent(self, event):
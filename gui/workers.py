@@ -0,0 +1,110 @@
+"""
+Background execution of PDFManager operations.
+
+Split and merge can take minutes on large files. Running them on the GUI
+thread freezes the window (and Windows marks it "Not Responding"), so they
+run on a QThread instead and report back through signals. Thumbnails are
+rendered in worker processes (logic/render_service.py) and delivered the
+same way.
+"""
+
+import threading
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from logic.pdf_ops import OperationCancelled
+from logic.render_service import RenderService
+
+
+class PDFTaskWorker(QObject):
+    """
+    Runs one PDFManager call on a worker thread.
+
+    The call must accept the `progress` and `should_cancel` keyword
+    arguments (split_pdf and merge_pdfs do). Signals are delivered to the
+    GUI thread through Qt's queued connections.
+    """
+
+    progress = pyqtSignal(int, int)   # pages done, pages total
+    finished = pyqtSignal(object)     # the call's return value
+    failed = pyqtSignal(str)          # error message
+    cancelled = pyqtSignal()
+
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        # threading.Event so the flag is safe to set from the GUI thread
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            result = self._func(
+                *self._args,
+                progress=self.progress.emit,
+                should_cancel=self._cancel_event.is_set,
+                **self._kwargs,
+            )
+        except OperationCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(result)
+
+    def cancel(self):
+        """Ask the operation to stop at the next page boundary."""
+        self._cancel_event.set()
+
+
+def start_task(parent, worker):
+    """
+    Moves a worker onto a new QThread and starts it.
+    The thread quits and both objects are deleted once the worker is done.
+
+    Returns:
+        QThread: The running thread (keep a reference while it runs).
+    """
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    for signal in (worker.finished, worker.failed, worker.cancelled):
+        signal.connect(thread.quit)
+    thread.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.start()
+    return thread
+
+
+class RenderServiceBridge(QObject):
+    """
+    A RenderService whose results arrive on the GUI thread.
+
+    The service calls back on a pool thread; re-emitting from there goes
+    through Qt's queued connections to this object's (the GUI) thread.
+    Results stay raw (width, height, stride, RGB samples) until a slot
+    turns them into a QPixmap.
+    """
+
+    rendered = pyqtSignal(object, object)   # task, (width, height, stride, samples)
+    failed = pyqtSignal(object, str)        # task, error message
+
+    def __init__(self, workers=None, thumbnail_cache=None, parent=None):
+        super().__init__(parent)
+        self.service = RenderService(workers, on_result=self.rendered.emit,
+                                     on_error=self.failed.emit,
+                                     thumbnail_cache=thumbnail_cache)
+
+    def submit(self, tasks):
+        self.service.submit(tasks)
+
+    def prioritize(self, tasks):
+        self.service.prioritize(tasks)
+
+    def discard(self, tasks):
+        self.service.discard(tasks)
+
+    def cancel(self):
+        self.service.cancel()
+
+    def shutdown(self):
+        self.service.shutdown()
@@ -0,0 +1,133 @@
+import hashlib
+import time
+from io import BytesIO
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+
+def serialize_stream(obj):
+    """Serialized bytes of a stream object (dictionary + raw data)."""
+    buffer = BytesIO()
+    obj.write_to_stream(buffer)
+    return buffer.getvalue()
+
+
+def content_digest(obj, memo):
+    """
+    SHA-256 of an object's content, independent of object numbering.
+
+    Indirect references are hashed as the digest of the object they point
+    to, so an image whose /ColorSpace or /SMask points at equal objects in
+    two different files gets the same digest in both.
+
+    Args:
+        obj: Any pypdf object.
+        memo (dict): Digest cache keyed by reference. Only share it between
+            calls on the same document.
+    """
+    hasher = hashlib.sha256()
+    _feed(obj, hasher, memo, set())
+    return hasher.digest()
+
+
+def _feed(obj, hasher, memo, active):
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in memo:
+            if key in active:
+                # Reference cycle: fall back to the object number. Such
+                # objects then only match within one document.
+                hasher.update(b"cycle %d" % obj.idnum)
+                return
+            active.add(key)
+            inner = hashlib.sha256()
+            _feed(obj.get_object(), inner, memo, active)
+            active.discard(key)
+            memo[key] = inner.digest()
+        hasher.update(b"R" + memo[key])
+    elif isinstance(obj, DictionaryObject):
+        hasher.update(b"<<")
+        for key in sorted(obj.keys()):
+            if key == "/Length":
+                continue  # Depends on how the length was written, not the data
+            hasher.update(key.encode("utf-8") + b" ")
+            _feed(obj.raw_get(key), hasher, memo, active)
+        hasher.update(b">>")
+        if isinstance(obj, StreamObject):
+            # Raw (still encoded) stream bytes; pypdf keeps them in _data
+            hasher.update(b"stream")
+            hasher.update(obj._data)
+    elif isinstance(obj, ArrayObject):
+        hasher.update(b"[")
+        for value in obj:
+            _feed(value, hasher, memo, active)
+        hasher.update(b"]")
+    else:
+        buffer = BytesIO()
+        obj.write_to_stream(buffer)
+        hasher.update(buffer.getvalue() + b" ")
+
+
+def dedupe_streams(writer):
+    """
+    Points duplicate stream objects (fonts, images, ICC profiles, ...) at a
+    single shared copy.
+
+    Documents produced by the same generator each embed their own copy of
+    the same font files and logos; after a merge the writer holds all of them.
+    Streams are compared by content_digest(), so only streams with identical
+    data and identical (transitively referenced) dictionaries are merged.
+    Non-stream objects (page dictionaries in particular) are left alone.
+
+    Args:
+        writer (PdfWriter): Writer holding the merged document, before write().
+
+    Returns:
+        dict: {"duplicates": int, "bytes_saved": int, "seconds": float}
+    """
+    start_time = time.perf_counter()
+    # pypdf has no public accessor for the writer's object table; this is the
+    # same list compress_identical_objects() works on.
+    objects = writer._objects
+    memo = {}
+    canonical = {}     # digest -> IndirectObject of the copy we keep
+    replacements = {}  # idnum of a duplicate -> IndirectObject to use instead
+    bytes_saved = 0
+
+    for index, obj in enumerate(objects):
+        if not isinstance(obj, StreamObject):
+            continue
+        digest = content_digest(IndirectObject(index + 1, 0, writer), memo)
+        if digest in canonical:
+            replacements[index + 1] = canonical[digest]
+            bytes_saved += len(serialize_stream(obj))
+        else:
+            canonical[digest] = IndirectObject(index + 1, 0, writer)
+
+    if replacements:
+        for obj in objects:
+            if obj is not None:
+                _replace_references(obj, replacements)
+        for idnum in replacements:
+            objects[idnum - 1] = None
+
+    return {
+        "duplicates": len(replacements),
+        "bytes_saved": bytes_saved,
+        "seconds": time.perf_counter() - start_time,
+    }
+
+
+def _replace_references(obj, replacements):
+    """Rewrites references to duplicates inside obj, in place."""
+    if isinstance(obj, DictionaryObject):
+        items = list(obj.items())
+    elif isinstance(obj, ArrayObject):
+        items = list(enumerate(obj))
+    else:
+        return
+    for key, value in items:
+        if isinstance(value, IndirectObject):
+            if value.idnum in replacements:
+                obj[key] = replacements[value.idnum]
+        else:
+            _replace_references(value, replacements)
@@ -0,0 +1,387 @@
+"""
+Page-manipulation engines behind PDFManager.
+
+    pypdf    pure Python (the default). Supports every PDFManager feature:
+             streaming merge, stream dedupe statistics, the reader cache
+             and mmap input.
+    pymupdf  MuPDF's C implementation through PyMuPDF. Copies pages much
+             faster (insert_pdf), especially for large files. Streaming
+             merge is not available; dedupe maps to MuPDF's duplicate-object
+             removal (garbage=3) and reports no statistics.
+
+Both engines implement the same small interface (plus `name` and
+`version`, which incremental splits record):
+    page_count(path)
+    open_source(path) / close_source(source)
+    release(source)     drop what the source has parsed so far (low_memory)
+    group_bytes(source, page_indices, profile, tracker)
+    write_merge(input_paths, output_path, stream, profile, tracker, dedupe)
+
+PyMuPDF is not thread-safe. The GUI renders its previews with PyMuPDF on
+the GUI thread while split/merge run on a worker thread, so the GUI keeps
+the pypdf engine; the pymupdf engine is meant for the CLI and scripts.
+"""
+
+import os
+from io import BytesIO
+import pypdf
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+from pypdf.generic import DictionaryObject, IndirectObject, NameObject
+from logic import tracing
+from logic.dedupe import dedupe_streams
+from logic.pdf_input import open_input, open_reader
+from logic.write_profiles import write_pdf
+
+ENGINES = ("pypdf", "pymupdf")
+
+# Write profiles (see logic/write_profiles.py) as PyMuPDF save() options
+PYMUPDF_SAVE_OPTIONS = {
+    "fast": {},
+    "balanced": {"deflate": True},
+    "compact": {"garbage": 3, "deflate": True, "use_objstms": 1},
+}
+
+
+def check_engine(engine):
+    """Raises ValueError for an unknown engine name."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine!r}")
+
+
+def make_engine(engine, reader_cache=None, use_mmap=False, low_memory=False):
+    """
+    Creates an engine by name. reader_cache and use_mmap only apply to pypdf.
+    A low_memory engine reads its inputs lazily and lets release() drop
+    parsed objects (see PDFManager.split_pdf).
+    """
+    check_engine(engine)
+    if engine == "pymupdf":
+        return PymupdfEngine(low_memory)
+    return PypdfEngine(reader_cache, use_mmap, low_memory)
+
+
+# Page attributes a /Pages node passes down to the pages below it
+_INHERITABLE_PAGE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def _page_index(reader):
+    """
+    (reference, inherited attributes) per page of a reader, in page order.
+
+    A compact stand-in for reader.pages, which holds a full PageObject
+    per page once any page is touched (a few KB each). Page dictionaries
+    read while walking the page tree are dropped again right away;
+    inherited attributes stay unresolved and are shared per /Pages node.
+
+    Raises:
+        PdfReadError: If the page tree refers back to itself.
+    """
+    parsed = reader.resolved_objects
+    index = []
+    seen = set()
+    stack = [(iter([reader.root_object.raw_get("/Pages")]), {})]
+    while stack:
+        kids, inherit = stack[-1]
+        kid = next(kids, None)
+        if kid is None:
+            stack.pop()
+            continue
+        node = kid.get_object()
+        # Damaged files may have anything in /Kids; pypdf skips it as well
+        if not isinstance(node, DictionaryObject) or not node:
+            continue
+        node_type = node.get("/Type", "/Pages" if "/Kids" in node else "/Page")
+        if node_type == "/Pages":
+            if id(node) in seen:
+                raise PdfReadError("Detected cyclic page references.")
+            seen.add(id(node))
+            inherit = dict(inherit)
+            for attr in _INHERITABLE_PAGE_ATTRIBUTES:
+                if attr in node:
+                    inherit[NameObject(attr)] = node.raw_get(attr)
+            stack.append((iter(node.get("/Kids", [])), inherit))
+        elif isinstance(kid, IndirectObject):
+            parsed.pop((kid.generation, kid.idnum), None)
+            index.append((kid, inherit))
+        else:
+            index.append((node, inherit))
+    return index
+
+
+def _contiguous_runs(page_indices):
+    """Splits page indices into (first, last) runs of consecutive pages."""
+    runs = []
+    for page_idx in page_indices:
+        if runs and page_idx == runs[-1][1] + 1:
+            runs[-1][1] = page_idx
+        else:
+            runs.append([page_idx, page_idx])
+    return runs
+
+
+class _LazySource:
+    """A low_memory reader's file and what its release() keeps track of."""
+
+    def __init__(self, file):
+        self.file = file
+        # Keys of resolved_objects dropped by the last release(), and the
+        # ones kept for good because they came back
+        self.dropped = set()
+        self.shared = set()
+        # _page_index() of the reader, built on first use
+        self.pages = None
+
+
+class PypdfEngine:
+    """
+    Pages are copied with pypdf's PdfWriter; readers come from a ReaderCache.
+
+    In low_memory mode readers bypass the cache and read through a file
+    handle (or mmap) instead of loading the file, and release() empties
+    the reader's cache of parsed objects - content streams, fonts, images.
+    What stays is a compact page index (see _page_index) and a bounded set
+    of objects shared between groups, such as the fonts every page uses.
+    """
+
+    # At most this many shared objects survive release(); past it, new
+    # ones are dropped like the rest (re-parsed, but memory stays capped)
+    MAX_SHARED_OBJECTS = 1000
+
+    name = "pypdf"
+
+    def __init__(self, reader_cache=None, use_mmap=False, low_memory=False):
+        self.version = pypdf.__version__
+        self.use_mmap = use_mmap
+        self.low_memory = low_memory
+        # Without a shared cache (e.g. in a pool worker) readers are not kept
+        self.reader_cache = None if low_memory else reader_cache
+        # id(reader) -> _LazySource, for low_memory sources
+        self._lazy = {}
+
+    def page_count(self, path):
+        source = self.open_source(path)
+        try:
+            return len(self._pages(source))
+        finally:
+            self.close_source(source)
+
+    def _pages(self, source):
+        """The pages of a source: reader.pages, or a compact index when low_memory."""
+        lazy = self._lazy.get(id(source))
+        if lazy is None:
+            return source.pages
+        if lazy.pages is None:
+            lazy.pages = _page_index(source)
+        return lazy.pages
+
+    def _page(self, source, page_idx):
+        """One page of a source as a PageObject (built on demand when low_memory)."""
+        if id(source) not in self._lazy:
+            return source.pages[page_idx]
+        node, inherit = self._pages(source)[page_idx]
+        if isinstance(node, IndirectObject):
+            page = PageObject(source, node)
+        else:
+            page = PageObject(source)
+            page.update(node)
+        for attr, value in inherit.items():
+            # A page's own value wins over the inherited one
+            if attr not in page:
+                page[attr] = value
+        return page
+
+    def open_source(self, path):
+        if self.low_memory:
+            f = open_input(path, self.use_mmap)
+            try:
+                reader = PdfReader(f)
+            except BaseException:
+                f.close()
+                raise
+            self._lazy[id(reader)] = _LazySource(f)
+            return reader
+        if self.reader_cache is not None:
+            return self.reader_cache.get(path)
+        return open_reader(path, self.use_mmap)
+
+    def close_source(self, source):
+        # Cached readers are shared (others are garbage collected); only a
+        # low_memory reader's own file handle needs closing
+        lazy = self._lazy.pop(id(source), None)
+        if lazy is not None:
+            lazy.file.close()
+
+    def release(self, source):
+        lazy = self._lazy.get(id(source))
+        parsed = source.resolved_objects
+        if lazy is None:
+            parsed.clear()
+            return
+        # An object parsed again right after it was dropped is shared by
+        # consecutive groups (fonts, a logo...); keep those rather than
+        # re-parsing them for every group. Everything else is re-read from
+        # the file if it is needed again.
+        fresh = parsed.keys() - lazy.shared
+        room = self.MAX_SHARED_OBJECTS - len(lazy.shared)
+        if room > 0:
+            lazy.shared.update(list(fresh & lazy.dropped)[:room])
+        for key in fresh - lazy.shared:
+            del parsed[key]
+        lazy.dropped = fresh
+
+    def group_bytes(self, source, page_indices, profile="fast", tracker=None):
+        """The bytes of a new PDF holding the given pages of an open reader."""
+        with tracing.span("split.build", "logic", pages=len(page_indices)):
+            writer = PdfWriter()
+            # Add all pages in this group to the new PDF
+            for page_idx in page_indices:
+                writer.add_page(self._page(source, page_idx))
+                if tracker:
+                    tracker.page_done()
+        with tracing.span("write.serialize", "logic", profile=profile):
+            buffer = BytesIO()
+            write_pdf(writer, buffer, profile)
+        return buffer.getbuffer()
+
+    def write_merge(self, input_paths, output_path, stream, profile="fast", tracker=None,
+                    dedupe=False):
+        """
+        Appends every input into one PdfWriter (outlines included) and writes it.
+
+        Returns:
+            dict: dedupe_streams() statistics, or None without dedupe.
+        """
+        merger = PdfWriter()
+        overwritten = {path for path in input_paths if _same_file(path, output_path)}
+        # Appending a cached reader skips re-parsing unchanged inputs. An
+        # input that is also the output is read into memory without mmap,
+        # so no mapping of it is left open at the rename.
+        readers = [open_reader(path) if path in overwritten and self.use_mmap
+                   else self.open_source(path)
+                   for path in input_paths]
+        if tracker:
+            tracker.total = sum(len(reader.pages) for reader in readers)
+
+        for reader in readers:
+            if tracker:
+                tracker.check()
+            # pypdf's append method (via PdfWriter) is efficient
+            # In older versions this was PdfFileMerger, now merged into PdfWriter
+            with tracing.span("merge.append", "logic", pages=len(reader.pages)):
+                merger.append(reader)
+            if tracker:
+                tracker.advance(len(reader.pages))
+
+        stats = None
+        if dedupe:
+            with tracing.span("dedupe", "logic"):
+                stats = dedupe_streams(merger)
+        if tracker:
+            tracker.check()
+
+        with tracing.span("write", "io", profile=profile):
+            write_pdf(merger, stream, profile)
+        return stats
+
+
+class PymupdfEngine:
+    """Pages are copied with PyMuPDF's insert_pdf, entirely in C."""
+
+    name = "pymupdf"
+
+    def __init__(self, low_memory=False):
+        # Imported here so the pypdf-only paths (and the CLI) never load it
+        import pymupdf
+        self._pymupdf = pymupdf
+        self.version = pymupdf.VersionBind
+        self.low_memory = low_memory
+
+    def page_count(self, path):
+        doc = self.open_source(path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+    def open_source(self, path):
+        with tracing.span("parse", "logic", engine=self.name):
+            return self._pymupdf.open(path)
+
+    def close_source(self, source):
+        source.close()
+
+    def release(self, source):
+        # MuPDF reads lazily anyway; empty its store of decoded objects
+        self._pymupdf.TOOLS.store_shrink(100)
+
+    def group_bytes(self, source, page_indices, profile="fast", tracker=None):
+        """The bytes of a new PDF holding the given pages of an open document."""
+        out = self._pymupdf.open()
+        try:
+            with tracing.span("split.build", "logic", pages=len(page_indices), engine=self.name):
+                # One insert_pdf call per run of consecutive pages
+                for first, last in _contiguous_runs(page_indices):
+                    out.insert_pdf(source, from_page=first, to_page=last, links=True, annots=True)
+                    if tracker:
+                        tracker.advance(last - first + 1)
+                        tracker.check()
+            with tracing.span("write.serialize", "logic", profile=profile, engine=self.name):
+                return out.tobytes(**PYMUPDF_SAVE_OPTIONS[profile])
+        finally:
+            out.close()
+
+    def write_merge(self, input_paths, output_path, stream, profile="fast", tracker=None,
+                    dedupe=False):
+        """
+        Inserts every input into one document, rebuilds the combined outline
+        (insert_pdf does not carry bookmarks over) and writes it.
+
+        Returns:
+            None: MuPDF's duplicate removal reports no statistics.
+        """
+        if tracker and tracker.progress:
+            # Opening a file is most of the cost of a small input: only
+            # count pages up front when someone shows the progress
+            tracker.total = sum(self.page_count(path) for path in input_paths)
+        out = self._pymupdf.open()
+        toc = []
+        try:
+            for path in input_paths:
+                if tracker:
+                    tracker.check()
+                source = self.open_source(path)
+                try:
+                    offset = len(out)
+                    with tracing.span("merge.append", "logic", pages=len(source),
+                                      engine=self.name):
+                        out.insert_pdf(source, links=True, annots=True)
+                    toc.extend([level, title, page + offset if page > 0 else page]
+                               for level, title, page in source.get_toc(simple=True))
+                    if tracker:
+                        tracker.advance(len(source))
+                finally:
+                    # Closed right away: the output may replace one of them
+                    source.close()
+            if toc:
+                out.set_toc(toc)
+            if tracker:
+                tracker.check()
+
+            options = dict(PYMUPDF_SAVE_OPTIONS[profile])
+            if dedupe:
+                options["garbage"] = max(options.get("garbage", 0), 3)
+            with tracing.span("write", "io", profile=profile, engine=self.name):
+                # Not out.save(stream): see write_pdf() in logic/write_profiles.py
+                stream.write(out.tobytes(**options))
+        finally:
+            out.close()
+        return None
+
+
+def _same_file(path, other_path):
+    """True if both paths exist and are the same file."""
+    try:
+        return os.path.samefile(path, other_path)
+    except OSError:
+        return False
@@ -0,0 +1,158 @@
+"""
+Writing output files safely and without stalling on slow storage.
+
+atomic_output() writes to a temporary file next to the target and renames
+it over the final name only once everything is written, so a crash,
+cancel or full disk never leaves a truncated PDF under the final name
+(and an existing file is only replaced by a complete one).
+
+OutputWriterPool overlaps serialization with disk I/O: the caller
+serializes one document into memory while threads write the previous
+ones out. On network drives, where every file costs round trips, this
+keeps the CPU busy instead of waiting on each write in turn.
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from logic import tracing
+
+# Large buffers turn the many small writes of a PDF serializer into few
+# big ones, which matters most on network storage.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# When to fsync:
+#   none  leave flushing to the OS (fastest; a power loss may lose recent files)
+#   file  fsync each file before it is renamed into place
+#   full  also fsync the folder after the rename, so the new name itself is
+#         durable (POSIX only; on Windows this is the same as "file")
+FSYNC_POLICIES = ("none", "file", "full")
+
+
+def check_fsync_policy(policy):
+    """Raises ValueError for an unknown fsync policy."""
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {policy!r}")
+
+
+@contextmanager
+def atomic_output(output_path, buffer_size=DEFAULT_BUFFER_SIZE, fsync="none"):
+    """
+    Opens a buffered binary file that only appears at output_path once the
+    with-block completes without an exception. On an exception the
+    temporary file is removed and output_path is left untouched.
+
+    Args:
+        output_path (str): Final file name.
+        buffer_size (int): Write buffer size in bytes.
+        fsync (str): One of FSYNC_POLICIES.
+    """
+    check_fsync_policy(fsync)
+    folder, name = os.path.split(os.path.abspath(output_path))
+    # Same folder, so the rename never crosses file systems. O_EXCL plus a
+    # random name keeps concurrent writers apart; mode 0o666 lets the umask
+    # apply, giving the final file normal permissions.
+    temp_path = os.path.join(folder, f".{name}.{uuid.uuid4().hex[:12]}.tmp")
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with open(fd, "wb", buffering=buffer_size) as f:
+            yield f
+            f.flush()
+            if fsync != "none":
+                os.fsync(f.fileno())
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync == "full" and os.name != "nt":
+        dir_fd = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class OutputWriterPool:
+    """
+    A bounded pool of threads writing finished documents to disk.
+
+    submit() hands over the serialized bytes of one file and returns at
+    once, unless `max_pending` files are already waiting, in which case it
+    blocks until one is written. That bound caps the memory held by queued
+    documents. Every file is written with atomic_output().
+
+    Use it as a context manager: leaving the block normally waits for all
+    writes and raises the first write error, if any; leaving it with an
+    exception drops queued writes and waits for running ones (see abort()).
+    """
+
+    def __init__(self, max_workers=4, max_pending=None, buffer_size=DEFAULT_BUFFER_SIZE,
+                 fsync="none"):
+        check_fsync_policy(fsync)
+        self.buffer_size = buffer_size
+        self.fsync = fsync
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="pdf-output")
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * max_workers)
+        self._futures = []
+        self._error = None
+
+    def submit(self, output_path, data):
+        """
+        Queues data (bytes or a buffer) to be written to output_path.
+        Raises the error of an earlier write that failed, if any.
+        """
+        self._raise_error()
+        self._slots.acquire()
+        # Only unfinished writes are kept (for abort()); holding on to every
+        # future would grow with the number of files
+        self._futures = [future for future in self._futures if not future.done()]
+        try:
+            future = self._executor.submit(self._write, output_path, data)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._on_done)
+        self._futures.append(future)
+
+    def close(self):
+        """Waits until every queued file is written; raises the first write error."""
+        self._executor.shutdown(wait=True)
+        self._raise_error()
+
+    def abort(self):
+        """Drops files that are still queued and waits for those being written."""
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def _write(self, output_path, data):
+        with tracing.span("write.disk", "io", file=os.path.basename(output_path),
+                          bytes=len(data)):
+            with atomic_output(output_path, self.buffer_size, self.fsync) as f:
+                f.write(data)
+
+    def _on_done(self, future):
+        self._slots.release()
+        if not future.cancelled() and future.exception() is not None and self._error is None:
+            self._error = future.exception()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,215 @@
+"""
+Page range expressions for split_pdf.
+
+An expression is a comma-separated list of parts. Each part becomes one
+output group, unless it is chunked with "/N":
+
+    5           page 5
+    1-3         pages 1 to 3
+    8-          page 8 to the last page
+    -4          first page to page 4
+    last        the last page (also usable as a bound: "10-last")
+    1-100:2     every 2nd page from 1 to 100 (1, 3, 5, ...)
+    odd, even   all odd / all even pages
+    1-100/10    pages 1 to 100 in groups of 10 (1-10, 11-20, ...)
+    every 10    the whole document in groups of 10
+
+Page numbers are 1-based and clamped to the document, like before: "1-999"
+on a 20-page file means pages 1-20, and parts that end up empty are
+dropped. Anything that is not valid syntax raises PageRangeError with the
+position of the problem.
+
+Compiled ranges only store one (range, chunk size) pair per part, so
+memory, parsing, membership tests and group iteration cost O(parts), not
+O(pages): "1-200000" is as cheap as "1-2".
+"""
+
+import re
+
+_TOKEN_RE = re.compile(r"\s*(?:(?P<number>\d+)|(?P<word>[A-Za-z]+)|(?P<symbol>[-:/,]))")
+_KEYWORDS = ("last", "odd", "even", "every")
+
+
+class PageRangeError(ValueError):
+    """Invalid page range expression. `position` is the 0-based offset of the problem."""
+
+    def __init__(self, message, position, expression):
+        self.position = position
+        self.expression = expression
+        super().__init__(f"{message} at position {position + 1} in {expression!r}")
+
+
+class PageRanges:
+    """
+    A compiled page range expression.
+
+    Iterating yields the output groups in order, each a `range` of 0-based
+    page indices (so len(), indexing and `in` work without building lists).
+    """
+
+    def __init__(self, spans):
+        # [(range of 0-based page indices, chunk size or None), ...]
+        self._spans = spans
+
+    @classmethod
+    def every(cls, total_pages, size=1):
+        """Groups of `size` pages over the whole document (size=1: one file per page)."""
+        return cls([(range(total_pages), size)] if total_pages > 0 else [])
+
+    def __iter__(self):
+        for span, chunk in self._spans:
+            if chunk:
+                for offset in range(0, len(span), chunk):
+                    yield span[offset:offset + chunk]
+            else:
+                yield span
+
+    def __len__(self):
+        """Number of groups."""
+        return sum(-(-len(span) // chunk) if chunk else 1 for span, chunk in self._spans)
+
+    def __bool__(self):
+        return bool(self._spans)
+
+    def __contains__(self, page_index):
+        """True if the 0-based page index is in any group."""
+        return any(page_index in span for span, _ in self._spans)
+
+    def page_count(self):
+        """Total pages over all groups (a page listed twice counts twice)."""
+        return sum(len(span) for span, _ in self._spans)
+
+    def pages(self):
+        """Yields every selected 0-based page index, group by group."""
+        for span, _ in self._spans:
+            yield from span
+
+    def __repr__(self):
+        return f"PageRanges({self._spans!r})"
+
+
+def compile_page_ranges(expression, max_pages):
+    """
+    Compiles an expression like "1-3, 5, 10-:2" for a document with
+    max_pages pages.
+
+    Returns:
+        PageRanges: The groups, in expression order.
+
+    Raises:
+        PageRangeError: On a syntax error, with the position of the problem.
+    """
+    return PageRanges(_Parser(expression, max_pages).parse())
+
+
+class _Parser:
+    """Small recursive-descent parser over the tokens of one expression."""
+
+    def __init__(self, expression, max_pages):
+        self.expression = expression
+        self.max_pages = max_pages
+        self.tokens = self._tokenize(expression)
+        self.index = 0
+
+    def _tokenize(self, expression):
+        tokens = []
+        position = 0
+        while position < len(expression):
+            if expression[position:].strip() == "":
+                break
+            match = _TOKEN_RE.match(expression, position)
+            if not match:
+                offset = len(expression[position:]) - len(expression[position:].lstrip())
+                raise PageRangeError(f"Unexpected character {expression[position + offset]!r}",
+                                     position + offset, expression)
+            kind = match.lastgroup
+            value = match.group(kind)
+            start = match.start(kind)
+            if kind == "word":
+                value = value.lower()
+                if value not in _KEYWORDS:
+                    raise PageRangeError(f"Unknown word {match.group(kind)!r}", start, expression)
+            tokens.append((kind, value, start))
+            position = match.end()
+        return tokens
+
+    def _peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None, len(self.expression))
+
+    def _take(self):
+        token = self._peek()
+        self.index += 1
+        return token
+
+    def _error(self, message, token=None):
+        position = (token or self._peek())[2]
+        raise PageRangeError(message, position, self.expression)
+
+    def parse(self):
+        spans = []
+        while self._peek()[0] is not None:
+            # Empty parts ("1,,3" or a trailing comma) are ignored
+            if self._peek()[1] == ",":
+                self._take()
+                continue
+            span, chunk = self._part()
+            if len(span):
+                spans.append((span, chunk))
+            if self._peek()[0] is not None:
+                if self._peek()[1] != ",":
+                    self._error("Expected ','")
+                self._take()
+        return spans
+
+    def _part(self):
+        kind, value, _ = self._peek()
+        step = 1
+        if value in ("odd", "even"):
+            self._take()
+            first, last = (1 if value == "odd" else 2), self.max_pages
+            step = 2
+        elif value == "every":
+            self._take()
+            size = self._positive_number("chunk size")
+            return self._span(1, self.max_pages, 1), size
+        else:
+            first = self._bound() if value != "-" else 1
+            last = first
+            if self._peek()[1] == "-":
+                self._take()
+                # "8-" runs to the end of the document
+                last = self._bound() if self._peek()[0] in ("number", "word") else self.max_pages
+            if self._peek()[1] == ":":
+                self._take()
+                step = self._positive_number("step")
+
+        chunk = None
+        if self._peek()[1] == "/":
+            self._take()
+            chunk = self._positive_number("chunk size")
+        return self._span(first, last, step), chunk
+
+    def _bound(self):
+        token = self._take()
+        kind, value, _ = token
+        if kind == "number":
+            if int(value) == 0:
+                self._error("Page numbers start at 1", token)
+            return int(value)
+        if value == "last":
+            return self.max_pages
+        self._error("Expected a page number", token)
+
+    def _positive_number(self, what):
+        token = self._take()
+        if token[0] != "number" or int(token[1]) == 0:
+            self._error(f"Expected a positive {what}", token)
+        return int(token[1])
+
+    def _span(self, first, last, step):
+        # Clamp to the document; an empty range is dropped by parse()
+        first = max(1, first)
+        last = min(self.max_pages, last)
+        if first > last:
+            return range(0)
+        return range(first - 1, last, step)
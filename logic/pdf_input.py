@@ -0,0 +1,51 @@
+"""
+How input PDFs are opened for reading.
+
+PdfReader(path) reads the whole file into a BytesIO first, so a 2 GB scan
+costs 2 GB of Python memory on top of the OS page cache holding the same
+bytes. With use_mmap=True the file is memory-mapped read-only instead and
+pypdf reads from the mapping: nothing is copied up front, only the objects
+that are actually parsed, and the OS pages the file in (and out again) as
+needed. Parallel split workers mapping the same file share those pages.
+
+Caveat: while a mapping is open the file must not be truncated or
+rewritten. On Linux/macOS that turns later reads into a crash (SIGBUS), on
+Windows the write fails because mapped files are locked. Callers that
+write over one of their own inputs must read that input without mmap.
+"""
+
+import mmap
+import os
+from pypdf import PdfReader
+
+
+def open_input(file_path, use_mmap=False):
+    """
+    Opens a PDF as a seekable binary stream.
+
+    Returns:
+        A read-only mmap.mmap if use_mmap is set (and the file is not empty,
+        which cannot be mapped), otherwise a regular file object. Both
+        support read/seek/tell, close() and the with-statement.
+    """
+    f = open(file_path, "rb")
+    if not use_mmap or os.fstat(f.fileno()).st_size == 0:
+        return f
+    try:
+        # The mapping keeps its own handle, so the file object can go
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+
+
+def open_reader(file_path, use_mmap=False):
+    """
+    Creates a PdfReader for a file.
+
+    Without mmap this is plain PdfReader(file_path), which loads the file
+    into memory. With mmap the reader keeps the mapping open for as long as
+    it lives; it is unmapped when the reader is garbage collected.
+    """
+    if not use_mmap:
+        return PdfReader(file_path)
+    return PdfReader(open_input(file_path, use_mmap=True))
@@ -1,9 +1,224 @@
+import hashlib
 import os
-from pypdf import PdfReader, PdfWriter
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pypdf import PdfReader
+from logic import tracing
+from logic.engines import check_engine, make_engine
+from logic.output_writer import (DEFAULT_BUFFER_SIZE, OutputWriterPool, atomic_output,
+                                 check_fsync_policy)
+from logic.page_ranges import PageRanges, compile_page_ranges
+from logic.pdf_input import open_input
+from logic.reader_cache import ReaderCache
+from logic.size_split import estimate_group_size, estimate_page_sizes, pack_pages_by_size
+from logic.split_manifest import SplitManifest, file_digest, manifest_path
+from logic.split_plan import SplitPlan
+from logic.stream_merge import StreamingMergeWriter
+from logic.write_profiles import check_profile
+
+
+class OperationCancelled(Exception):
+    """Raised when a split or merge is stopped through its should_cancel callback."""
+
+
+class _Progress:
+    """
+    Per-page progress reporting and cancellation for one operation.
+
+    Args:
+        total (int): Pages the operation will process.
+        progress (callable): Optional progress(done, total), called as pages
+            are processed. It runs on the thread doing the work.
+        should_cancel (callable): Optional should_cancel() -> bool, polled at
+            every page boundary.
+    """
+
+    def __init__(self, total, progress=None, should_cancel=None):
+        self.total = total
+        self.done = 0
+        self.progress = progress
+        self.should_cancel = should_cancel
+
+    def check(self):
+        if self.should_cancel and self.should_cancel():
+            raise OperationCancelled()
+
+    def advance(self, pages=1):
+        self.done += pages
+        if self.progress:
+            self.progress(self.done, self.total)
+
+    def page_done(self):
+        """Called after each page: report it, then stop here if cancelled."""
+        self.advance(1)
+        self.check()
+
+
+def _remove_files(paths):
+    """Best-effort removal of (partial) outputs after a cancel or failure."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _split_worker(input_path, output_folder, outputs, profile, use_mmap=False,
+                  fsync="none", engine="pypdf", hash_outputs=False, low_memory=False):
+    """
+    Process pool entry point for the parallel split.
+
+    Every worker opens the input itself - parsed PDF objects cannot be
+    shared between processes - and writes the share of outputs, as
+    (file name, page indices) pairs, it was given.
+    The processes already overlap with each other's disk writes, so each
+    one writes its files directly (still atomically).
+    This has to live at module level so it can be pickled on Windows.
+
+    Returns:
+        list: (path, bytes, SHA-256 or None) per written file.
+    """
+    engine = make_engine(engine, use_mmap=use_mmap, low_memory=low_memory)
+    source = engine.open_source(input_path)
+    written = []
+    try:
+        for file_name, page_indices in outputs:
+            output_path = os.path.join(output_folder, file_name)
+            with tracing.span("split.group", "logic", pages=len(page_indices)):
+                data = engine.group_bytes(source, page_indices, profile)
+                if low_memory:
+                    engine.release(source)
+                with atomic_output(output_path, fsync=fsync) as f:
+                    f.write(data)
+            written.append(_written_record(output_path, data, hash_outputs))
+    finally:
+        engine.close_source(source)
+    tracing.save_in_worker()
+    return written
+
+
+def _merge_worker(input_paths, output_path, engine="pypdf", use_mmap=False):
+    """
+    Process pool entry point for the tree merge: merges one chunk of the
+    input list into an intermediate document in the scratch folder. The
+    intermediate only lives until the final pass has read it, so it is
+    written with the "fast" profile and without dedupe.
+    Module level so it can be pickled on Windows.
+    """
+    engine = make_engine(engine, use_mmap=use_mmap)
+    with tracing.span("merge.tree_chunk", "logic", files=len(input_paths)):
+        with open(output_path, "wb", buffering=DEFAULT_BUFFER_SIZE) as f:
+            engine.write_merge(input_paths, output_path, f)
+    tracing.save_in_worker()
+    return output_path
+
+
+def _written_record(output_path, data, hash_outputs):
+    """(path, bytes, SHA-256 or None) of one output, hashed from memory."""
+    return (output_path, len(data),
+            hashlib.sha256(data).hexdigest() if hash_outputs else None)
+
+
+def _probe_pdf_info(file_path):
+    """
+    Page count from the trailer, xref and page-tree root only.
+
+    Opening PdfReader on a file handle parses just the xref table and
+    trailer; reading /Root -> /Pages -> /Count then resolves two objects.
+    len(reader.pages) would instead walk and copy every page in the tree.
+    Files whose root count is missing or unusable fall back to the full reader.
+    Module level so it can run in a process pool.
+    """
+    start_time = time.perf_counter()
+    info = {"path": file_path}
+    with tracing.span("info.probe", "logic") as probe_span:
+        try:
+            with open(file_path, "rb") as f:
+                reader = PdfReader(f)
+                count = reader.trailer["/Root"]["/Pages"]["/Count"]
+                if not isinstance(count, int) or count < 0:
+                    raise ValueError(f"Unusable page count: {count!r}")
+            info.update({"num_pages": int(count), "valid": True, "method": "fast"})
+        except Exception:
+            try:
+                reader = PdfReader(file_path)
+                info.update({"num_pages": len(reader.pages), "valid": True, "method": "full"})
+            except Exception as e:
+                info.update({"valid": False, "error": str(e), "method": "full"})
+        probe_span.set(method=info["method"])
+    info["seconds"] = time.perf_counter() - start_time
+    return info
+
+
+def _probe_worker(file_paths):
+    """
+    Process pool entry point for get_pdf_info_many: probes one batch of
+    files. Module level so it can be pickled on Windows.
+    """
+    with tracing.span("info.probe_batch", "logic", files=len(file_paths)):
+        results = [_probe_pdf_info(path) for path in file_paths]
+    tracing.save_in_worker()
+    return results
+
+
+def _run_in_pool(workers, calls, tracker, weights, cleanup=None):
+    """
+    Runs calls in a process pool, checking for a cancel while they run.
+
+    Args:
+        workers (int): Worker processes.
+        calls (list): (function, args) per call; functions must be module
+            level so they can be pickled.
+        tracker (_Progress): Advanced by weights[index] as call `index`
+            finishes, and checked for a cancel at least every 0.2 seconds.
+        weights (list): Progress units per call.
+        cleanup (callable): Optional cleanup(finished) after an error or
+            cancel, with the results of the calls that did finish.
+
+    Returns:
+        list: The results, in call order.
+    """
+    results = [None] * len(calls)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    futures = {}
+    try:
+        for index, (function, args) in enumerate(calls):
+            futures[pool.submit(function, *args)] = index
+        pending = set(futures)
+        while pending:
+            # Wake up regularly so a cancel doesn't wait for a slow call
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures[future]
+                results[index] = future.result()
+                tracker.advance(weights[index])
+            tracker.check()
+    except BaseException:
+        # Drop queued calls and let running ones finish
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+        if cleanup is not None:
+            cleanup([future.result() for future in futures
+                     if future.done() and not future.cancelled()
+                     and future.exception() is None])
+        raise
+    pool.shutdown(wait=True)
+    return results
+
+
+def _chunk(items, count):
+    """Splits a list into at most `count` contiguous, order-preserving chunks."""
+    size = max(1, -(-len(items) // count))  # ceiling division
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 class PDFManager:
     """
-    Handles the core PDF logic using pypdf.
+    Handles the core PDF logic. Pages are copied by an engine - pypdf by
+    default, or PyMuPDF (see logic/engines.py) - chosen for the whole
+    manager or per call.
     
     Architectural Note:
     We separate this logic from the GUI (window.py). This is known as
@@ -13,44 +228,180 @@ class PDFManager:
     3. Keep the code clean and readable.
     """
 
-    def get_pdf_info(self, file_path):
+    # Each worker gets several chunks so a slow chunk (e.g. heavy scans)
+    # doesn't leave the other cores idle at the end of the run.
+    CHUNKS_PER_WORKER = 4
+
+    MERGE_MODES = ("standard", "streaming", "tree")
+
+    # A tree merge only hands a worker a chunk if it has at least this many
+    # inputs; below that, the extra write and re-read of the intermediate
+    # costs more than the parallel appends save.
+    MIN_TREE_CHUNK = 16
+
+    def __init__(self, cache_entries=32, cache_bytes=512 * 1024 * 1024, use_mmap=False,
+                 output_workers=4, fsync_policy="none", engine="pypdf"):
+        # Default engine for get_pdf_info / split_pdf / merge_pdfs; each of
+        # them also takes engine=... to override it for one call.
+        check_engine(engine)
+        self.engine = engine
+        self._engines = {}
+
+        # Outputs are written to a temporary name and renamed into place when
+        # complete (see logic/output_writer.py). In-process splits serialize
+        # on the calling thread while up to output_workers threads write.
+        # fsync_policy is "none", "file" or "full" (see FSYNC_POLICIES).
+        check_fsync_policy(fsync_policy)
+        self.output_workers = output_workers
+        self.fsync_policy = fsync_policy
+
+        # Read inputs through a read-only memory map instead of loading each
+        # file into memory (see logic/pdf_input.py). Worth it for very large
+        # scans; for small files the difference is noise.
+        self.use_mmap = use_mmap
+
+        # Parsed readers are reused across get_pdf_info / split / merge calls
+        # as long as the file on disk hasn't changed (see ReaderCache).
+        self.reader_cache = ReaderCache(max_entries=cache_entries, max_bytes=cache_bytes,
+                                        use_mmap=use_mmap)
+
+        # Timing of the most recent split, e.g. for a status bar or the CLI.
+        # {"pages": int, "files": int, "seconds": float, "pages_per_second": float}
+        self.last_split_stats = None
+
+        # Result of the most recent merge's dedupe pass, or None if it was off
+        # (or ran in the pymupdf engine, which reports no statistics).
+        # {"duplicates": int, "bytes_saved": int, "seconds": float}
+        self.last_dedupe_stats = None
+
+    def _get_engine(self, engine=None, low_memory=False):
+        """The engine instance for a name (None: the manager's default)."""
+        key = (engine or self.engine, low_memory)
+        if key not in self._engines:
+            self._engines[key] = make_engine(key[0], self.reader_cache, self.use_mmap,
+                                             low_memory)
+        return self._engines[key]
+
+    @tracing.traced("get_pdf_info", "logic")
+    def get_pdf_info(self, file_path, engine=None):
         """
         Returns basic info about the PDF to display to the user.
         """
         try:
-            reader = PdfReader(file_path)
-            # len(reader.pages) is the standard way to get page count in pypdf 3.x+
-            return {"num_pages": len(reader.pages), "valid": True}
+            return {"num_pages": self._get_engine(engine).page_count(file_path), "valid": True}
         except Exception as e:
             return {"valid": False, "error": str(e)}
 
+    @tracing.traced("get_pdf_info_many", "logic")
+    def get_pdf_info_many(self, file_paths, workers=None):
+        """
+        Page counts for many files at once, e.g. a whole folder before
+        planning jobs. Uses the cheap trailer/page-tree probe and only
+        falls back to a full parse for files where that fails.
+
+        Args:
+            file_paths (list): Paths to probe.
+            workers (int): Worker processes. None (default) uses one per
+                CPU core, 1 probes in this process.
+
+        Returns:
+            list: One dict per path, in input order, with "path", "valid",
+                "num_pages" (or "error"), "method" ("fast" or "full") and
+                "seconds" spent on that file.
+        """
+        file_paths = list(file_paths)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(file_paths))
+
+        if workers <= 1:
+            return [_probe_pdf_info(path) for path in file_paths]
+
+        # Probes are tiny, so hand them out in batches to cut IPC overhead
+        # (and to save a worker's trace once per batch, not per file)
+        batches = _chunk(file_paths, workers * self.CHUNKS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return [info for batch in pool.map(_probe_worker, batches) for info in batch]
+
     def parse_page_groups(self, range_str, max_pages):
         """
-        Parses a string like "1-3, 5" into a list of page lists.
-        Example: "1-3, 5" -> [[0, 1, 2], [4]] (0-indexed)
+        Parses a string like "1-3, 5" into page groups (see logic/page_ranges.py
+        for the full syntax: steps, odd/even, last, open ends, chunking).
+        Example: "1-3, 5" -> [range(0, 3), range(4, 5)] (0-indexed)
+
+        Returns:
+            PageRanges: Lazy groups; iterating yields one range per group.
+
+        Raises:
+            PageRangeError: If the string is malformed, with the position.
+        """
+        return compile_page_ranges(range_str, max_pages)
+
+    @tracing.traced("plan_split", "logic")
+    def plan_split(self, input_path, file_prefix="split", range_str=None, max_bytes=None,
+                   estimate_sizes=False, engine=None, low_memory=False):
         """
-        groups = []
-        try:
-            parts = [p.strip() for p in range_str.split(',') if p.strip()]
-            for part in parts:
-                if '-' in part:
-                    start, end = map(int, part.split('-'))
-                    # Convert 1-based to 0-based, inclusive
-                    # Ensure within bounds
-                    start = max(1, start)
-                    end = min(max_pages, end)
-                    if start > end:
-                        continue
-                    groups.append(list(range(start - 1, end)))
-                else:
-                    page_num = int(part)
-                    if 1 <= page_num <= max_pages:
-                        groups.append([page_num - 1])
-        except ValueError:
-            pass # Ignore malformed parts for now
-        return groups
-
-    def split_pdf(self, input_path, output_folder, file_prefix="split", range_str=None):
+        Works out what split_pdf would write - output names and page
+        groups - without writing anything (see logic/split_plan.py).
+
+        Args:
+            input_path (str): Full path to source PDF.
+            file_prefix, range_str, max_bytes: As for split_pdf.
+            estimate_sizes (bool): Also estimate each output's size. This
+                parses every object of the input once (pypdf), which costs
+                about as much as reading the file, but nothing is written.
+                The estimate is for the "fast" profile, which writes the
+                largest files. With max_bytes the pages are measured
+                anyway, so the estimate costs next to nothing extra.
+            engine (str): Engine that counts the pages; None uses self.engine.
+            low_memory (bool): As for split_pdf: don't keep the parsed
+                input in the reader cache.
+
+        Returns:
+            SplitPlan: The planned outputs. Without estimates, groups stay
+                lazy, so planning a 100,000-file split is cheap.
+
+        Raises:
+            PageRangeError: If range_str is malformed.
+            ValueError: If both range_str and max_bytes are given, or
+                max_bytes is not positive.
+        """
+        if max_bytes is not None:
+            if range_str:
+                raise ValueError("Use either range_str or max_bytes, not both")
+            if max_bytes <= 0:
+                raise ValueError("max_bytes must be positive")
+        total_pages = self._get_engine(engine, low_memory).page_count(input_path)
+        oversized = 0
+        measured = None
+        if (max_bytes is not None or estimate_sizes) and low_memory:
+            # Measuring parses every object once; the reader goes right after
+            with open_input(input_path, self.use_mmap) as f:
+                measured = estimate_page_sizes(PdfReader(f))
+        elif max_bytes is not None or estimate_sizes:
+            measured = estimate_page_sizes(self.reader_cache.get(input_path))
+
+        # Determine how to split
+        if max_bytes is not None:
+            spans, oversized = pack_pages_by_size(*measured, max_bytes)
+            groups = PageRanges([(span, None) for span in spans])
+        elif range_str:
+            groups = self.parse_page_groups(range_str, total_pages)
+        else:
+            # Default: specific "explode" behavior (one page per group)
+            groups = PageRanges.every(total_pages)
+
+        sizes = None
+        if estimate_sizes:
+            sizes = [estimate_group_size(page_indices, *measured) for page_indices in groups]
+        return SplitPlan(os.path.basename(input_path), total_pages, groups, file_prefix,
+                         sizes=sizes, oversized=oversized)
+
+    @tracing.traced("split_pdf", "logic")
+    def split_pdf(self, input_path, output_folder, file_prefix="split", range_str=None,
+                  workers=1, profile="fast", max_bytes=None, progress=None,
+                  should_cancel=None, engine=None, plan=None, incremental=False,
+                  low_memory=False):
         """
         Splits a PDF into individual pages or groups.
         
@@ -58,72 +409,331 @@ class PDFManager:
             input_path (str): Full path to source PDF.
             output_folder (str): Folder to save split files.
             file_prefix (str): Prefix for filenames.
-            range_str (str): Optional string like "1-3, 5".
+            range_str (str): Optional string like "1-3, 5" or "every 10".
+            workers (int): Number of worker processes. 1 (default) splits in
+                this process, None uses one worker per CPU core.
+            profile (str): Write profile, "fast", "balanced" or "compact"
+                (see logic/write_profiles.py).
+            max_bytes (int): Instead of range_str, split into consecutive
+                pages packed into files of at most this many bytes. Sizes
+                are estimated up front from the parsed objects (shared
+                fonts and images counted once per file), so no trial files
+                are written. The estimate is for the "fast" profile; the
+                other profiles only make files smaller. A single page larger
+                than the limit still gets its own file, counted in
+                last_split_stats["oversized"].
+            progress (callable): Optional progress(pages_done, pages_total).
+                In-process splits report every page, parallel splits every
+                finished chunk.
+            should_cancel (callable): Optional should_cancel() -> bool, checked
+                at every page boundary (every chunk boundary in parallel mode).
+            engine (str): "pypdf" or "pymupdf"; None uses self.engine. The
+                max_bytes estimate always comes from pypdf's parse.
+            plan (SplitPlan): Write exactly these outputs (from plan_split(),
+                possibly loaded from JSON or a shard) instead of working
+                them out from file_prefix/range_str/max_bytes.
+            incremental (bool): Keep outputs that an earlier incremental
+                split of the same input content, with the same settings,
+                already wrote and that are still intact; write only the
+                missing or stale ones (see logic/split_manifest.py).
+                last_split_stats then counts what was written, skipped
+                and removed.
+            low_memory (bool): Keep memory flat while exploding very large
+                files: the input is read lazily (not loaded, not cached)
+                and everything parsed for a group - content streams,
+                fonts, images - is dropped once its output is serialized,
+                except a bounded set of objects that consecutive groups
+                share (fonts used on every page). Pages are found through
+                a compact index instead of pypdf's page list. A little
+                slower; max_bytes still measures the whole document once
+                up front.
         
         Returns:
-            list: Paths of created files.
+            list: Paths of the split's files, in group order (with
+                incremental, kept files included).
+
+        Raises:
+            PageRangeError: If range_str is malformed (nothing is written).
+            ValueError: If both range_str and max_bytes are given, or
+                max_bytes is not positive, or a plan is combined with
+                range_str/max_bytes or was made for a different page count.
+            OperationCancelled: If should_cancel() returned True. Files
+                already written by this call are removed first, as they are
+                on any other error.
         """
-        created_files = []
-        reader = PdfReader(input_path)
-        total_pages = len(reader.pages)
-        
-        # Determine how to split
-        if range_str:
-            groups = self.parse_page_groups(range_str, total_pages)
-            if not groups:
-                # Fallback if parse failed or empty? Or raise error?
-                # For now let's just return empty list or fallback to all?
-                # Let's return empty to indicate "no valid pages selected"
-                return []
+        check_profile(profile)
+        engine = self._get_engine(engine, low_memory)
+        start_time = time.perf_counter()
+        if plan is None:
+            plan = self.plan_split(input_path, file_prefix, range_str, max_bytes,
+                                   engine=engine.name, low_memory=low_memory)
         else:
-            # Default: specific "explode" behavior (one page per group)
-            groups = [[i] for i in range(total_pages)]
-            
-        for i, page_indices in enumerate(groups):
-            if not page_indices:
-                continue
-                
-            writer = PdfWriter()
-            # Add all pages in this group to the new PDF
-            for page_idx in page_indices:
-                writer.add_page(reader.pages[page_idx])
-            
-            # Naming logic
-            if len(page_indices) == 1:
-                # Single page: split_page_1.pdf
-                suffix = f"page_{page_indices[0] + 1}"
-            else:
-                # Range: split_pages_1-3.pdf
-                first = page_indices[0] + 1
-                last = page_indices[-1] + 1
-                suffix = f"pages_{first}-{last}"
-                
-            output_filename = f"{file_prefix}_{suffix}.pdf"
-            output_path = os.path.join(output_folder, output_filename)
-            
-            with open(output_path, "wb") as f:
-                writer.write(f)
-            
-            created_files.append(output_path)
-            
-        return created_files
-
-    def merge_pdfs(self, input_paths, output_path):
+            if range_str or max_bytes is not None:
+                raise ValueError("A plan already fixes the page groups; "
+                                 "don't pass range_str or max_bytes")
+            total_pages = engine.page_count(input_path)
+            if total_pages != plan.total_pages:
+                raise ValueError(f"The plan is for a {plan.total_pages}-page document, "
+                                 f"this input has {total_pages} pages")
+        if not plan:
+            # Valid syntax, but no page of this document selected
+            return []
+
+        all_files = [os.path.join(output_folder, file_name) for file_name, _ in plan]
+        manifest = None
+        removed = []
+        if incremental:
+            manifest, plan, removed = self._check_split_manifest(
+                input_path, output_folder, plan, profile, engine,
+                {"ranges": range_str, "max_bytes": max_bytes})
+
+        pages_written = plan.page_count()
+        tracker = _Progress(pages_written, progress, should_cancel)
+        tracker.check()
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(plan))
+
+        if workers > 1:
+            # Chunking for the pool needs an indexable list (of ranges, still
+            # one small object per group rather than one int per page)
+            written = self._split_parallel(input_path, output_folder, list(plan),
+                                           workers, profile, tracker, engine.name,
+                                           hash_outputs=manifest is not None,
+                                           low_memory=low_memory)
+        elif plan:
+            written = []
+            source = engine.open_source(input_path)
+            try:
+                # Serialize here while the pool writes earlier groups to disk
+                with OutputWriterPool(self.output_workers, fsync=self.fsync_policy) as outputs:
+                    for file_name, page_indices in plan:
+                        output_path = os.path.join(output_folder, file_name)
+                        data = engine.group_bytes(source, page_indices, profile, tracker)
+                        if low_memory:
+                            engine.release(source)
+                        # Listed before it is queued, so a file that is already
+                        # written when a later group fails is cleaned up too
+                        written.append(_written_record(output_path, data, manifest is not None))
+                        outputs.submit(output_path, data)
+            except BaseException:
+                _remove_files(path for path, _, _ in written)
+                raise
+            finally:
+                engine.close_source(source)
+        else:
+            # Incremental split with every output up to date
+            written = []
+
+        if manifest is not None:
+            for (file_name, page_indices), (_, num_bytes, digest) in zip(plan, written):
+                manifest.record(file_name, page_indices, num_bytes, digest)
+            manifest.save()
+
+        elapsed = time.perf_counter() - start_time
+        self.last_split_stats = {
+            "pages": pages_written,
+            "files": len(written),
+            "bytes": sum(num_bytes for _, num_bytes, _ in written),
+            "seconds": elapsed,
+            "pages_per_second": pages_written / elapsed if elapsed > 0 else 0.0,
+            "oversized": plan.oversized,
+            "skipped": len(all_files) - len(written),
+            "removed": len(removed),
+        }
+        return all_files
+
+    def _check_split_manifest(self, input_path, output_folder, plan, profile, engine, info):
+        """
+        Sorts the outputs of an incremental split into kept and to-write.
+
+        Returns:
+            tuple: (manifest, plan of the outputs to write, removed paths).
+        """
+        with tracing.span("split.manifest_check", "logic", files=len(plan)):
+            settings = {"input_sha256": file_digest(input_path), "profile": profile,
+                        "engine": engine.name, "engine_version": engine.version}
+            manifest = SplitManifest.load(manifest_path(output_folder, input_path), settings,
+                                          dict(info, input=os.path.basename(input_path)))
+            names = []
+            groups = []
+            for file_name, page_indices in plan:
+                if not manifest.is_current(output_folder, file_name, page_indices):
+                    names.append(file_name)
+                    groups.append(page_indices)
+
+            planned = {file_name for file_name, _ in plan}
+            removed = []
+            for file_name in manifest.obsolete(planned):
+                if plan.shard_info is not None:
+                    # Probably another shard's output in a shared folder
+                    manifest.keep(file_name)
+                    continue
+                path = os.path.join(output_folder, file_name)
+                _remove_files([path])
+                manifest.forget(file_name)
+                removed.append(path)
+
+        todo = SplitPlan(plan.input_name, plan.total_pages, groups, names=names,
+                         oversized=plan.oversized, shard=plan.shard_info)
+        return manifest, todo, removed
+
+    def _split_parallel(self, input_path, output_folder, outputs, workers, profile,
+                        tracker, engine, hash_outputs=False, low_memory=False):
+        """
+        Spreads the (file name, page indices) outputs over a process pool.
+        Chunks are contiguous and results are stored by chunk index, so the
+        flattened result matches the sequential split exactly.
+
+        Returns:
+            list: (path, bytes, SHA-256 or None) per file, in output order.
+        """
+        chunks = _chunk(outputs, workers * self.CHUNKS_PER_WORKER)
+        calls = [(_split_worker, (input_path, output_folder, chunk, profile, self.use_mmap,
+                                  self.fsync_policy, engine, hash_outputs, low_memory))
+                 for chunk in chunks]
+        results = _run_in_pool(
+            workers, calls, tracker,
+            weights=[sum(len(g) for _, g in chunk) for chunk in chunks],
+            # After an error or cancel: remove everything this split wrote
+            cleanup=lambda finished: _remove_files(
+                record[0] for records in finished for record in records))
+        return [record for records in results for record in records]
+
+    @tracing.traced("merge_pdfs", "logic")
+    def merge_pdfs(self, input_paths, output_path, mode="standard", dedupe=False,
+                   profile="fast", progress=None, should_cancel=None, engine=None,
+                   workers=None, scratch_dir=None):
         """
         Merges multiple PDFs into one.
         
         Args:
             input_paths (list): List of file path strings.
             output_path (str): Destination path.
+            mode (str): "standard" builds the whole document in memory and
+                keeps bookmarks. "streaming" writes each input to disk as
+                soon as it is read, so memory stays bounded by the largest
+                single input instead of the total (see StreamingMergeWriter);
+                only pages are carried over. It bypasses the reader cache.
+                "tree" is for long lists of small files: worker processes
+                merge contiguous chunks of the list into intermediate files,
+                then a final pass concatenates those in order. Page and
+                bookmark order are the same as in "standard" mode. The final
+                pass still copies every page once on one core, so the gain
+                is the per-file cost (open, parse, append) spread over the
+                cores. Lists too short to chunk (see MIN_TREE_CHUNK), or a
+                single worker, merge as "standard".
+            dedupe (bool): Store byte-identical streams (fonts, images, color
+                profiles) only once. The savings and the time the pass took
+                end up in self.last_dedupe_stats.
+            profile (str): Write profile, "fast", "balanced" or "compact"
+                (see logic/write_profiles.py). Streaming mode writes as it
+                reads, so it only supports "fast".
+            progress (callable): Optional progress(pages_done, pages_total).
+                Streaming merges report every page; standard merges report
+                after each input, since pypdf appends a file in one call.
+                Tree merges report input files instead of pages,
+                progress(files_done, files_total), as worker chunks finish:
+                page counts are only known once the workers open the files.
+            should_cancel (callable): Optional should_cancel() -> bool, checked
+                at the same points.
+            engine (str): "pypdf" or "pymupdf"; None uses self.engine.
+                Streaming mode needs pypdf. With pymupdf, dedupe leaves
+                self.last_dedupe_stats at None.
+            workers (int): Tree mode only: worker processes, None for one
+                per CPU core.
+            scratch_dir (str): Tree mode only: where the intermediate files
+                go (in a temporary folder that is removed afterwards).
+                Defaults to the system temp folder; pick a fast local disk
+                with room for roughly the size of the output.
+
+        The output is written to a temporary file and renamed into place
+        when complete, so it may be one of the inputs, and an existing file
+        at output_path stays intact if the merge fails or is cancelled.
+
+        Raises:
+            ValueError: For an unknown mode, profile or engine.
+            OperationCancelled: If should_cancel() returned True.
         """
-        merger = PdfWriter()
-        
-        for path in input_paths:
-            # pypdf's append method (via PdfWriter) is efficient
-            # In older versions this was PdfFileMerger, now merged into PdfWriter
-            merger.append(path)
-            
-        with open(output_path, "wb") as f:
-            merger.write(f)
+        if mode not in self.MERGE_MODES:
+            raise ValueError(f"Unknown merge mode: {mode!r}")
+        check_profile(profile)
+        if mode == "streaming" and profile != "fast":
+            raise ValueError("Streaming merge only supports the 'fast' write profile")
+        engine = self._get_engine(engine)
+        if mode == "streaming" and engine.name != "pypdf":
+            raise ValueError("Streaming merge is only available with the pypdf engine")
+
+        self.last_dedupe_stats = None
+        if self.use_mmap:
+            # A mapped file can't be replaced on Windows: drop any cached
+            # reader of the output before renaming over it (in every mode)
+            self.reader_cache.invalidate(output_path)
+
+        if mode == "streaming":
+            # Page counts from the cheap probe, just for progress reporting
+            total = sum(_probe_pdf_info(path).get("num_pages", 0) for path in input_paths)
+            tracker = _Progress(total, progress, should_cancel)
+            # Each input is closed (and unmapped) right after its pages are
+            # written, so by the rename none of them is still open
+            with atomic_output(output_path, fsync=self.fsync_policy) as f:
+                writer = StreamingMergeWriter(f, dedupe=dedupe, use_mmap=self.use_mmap)
+                for path in input_paths:
+                    tracker.check()
+                    with tracing.span("merge.append_streaming", "logic",
+                                      file=os.path.basename(path)):
+                        writer.append(path, on_page=tracker.page_done)
+                writer.close()
+            if dedupe:
+                self.last_dedupe_stats = writer.dedupe_stats
+            return output_path
+
+        if mode == "tree":
+            if workers is None:
+                workers = os.cpu_count() or 1
+            chunk_count = min(workers * self.CHUNKS_PER_WORKER,
+                              len(input_paths) // self.MIN_TREE_CHUNK)
+            if workers > 1 and chunk_count > 1:
+                self.last_dedupe_stats = self._merge_tree(
+                    input_paths, output_path, dedupe, profile, progress, should_cancel,
+                    engine, workers, chunk_count, scratch_dir)
+                return output_path
+
+        # The engine sets the page total once it has opened the inputs
+        tracker = _Progress(0, progress, should_cancel)
+        with atomic_output(output_path, fsync=self.fsync_policy) as f:
+            self.last_dedupe_stats = engine.write_merge(input_paths, output_path, f, profile,
+                                                        tracker, dedupe)
         
         return output_path
+
+    def _merge_tree(self, input_paths, output_path, dedupe, profile, progress,
+                    should_cancel, engine, workers, chunk_count, scratch_dir):
+        """
+        Tree merge: chunks of the input list are merged in a process pool,
+        then the intermediates are concatenated in list order.
+
+        Returns:
+            dict: The final pass's dedupe statistics, or None.
+        """
+        chunks = _chunk(list(input_paths), chunk_count)
+        tracker = _Progress(len(input_paths), progress, should_cancel)
+        scratch = tempfile.mkdtemp(prefix="merge-", dir=scratch_dir)
+        try:
+            intermediates = [os.path.join(scratch, f"part_{index:05d}.pdf")
+                             for index in range(len(chunks))]
+            calls = [(_merge_worker, (chunk, intermediate, engine.name, self.use_mmap))
+                     for chunk, intermediate in zip(chunks, intermediates)]
+            _run_in_pool(min(workers, len(chunks)), calls, tracker,
+                         weights=[len(chunk) for chunk in chunks])
+
+            # Final pass: intermediates are read once, so they bypass the
+            # reader cache (and mmap, which would keep them open on Windows)
+            final = make_engine(engine.name)
+            with tracing.span("merge.tree_final", "logic", parts=len(intermediates)):
+                with atomic_output(output_path, fsync=self.fsync_policy) as f:
+                    return final.write_merge(intermediates, output_path, f, profile,
+                                             _Progress(0, None, should_cancel), dedupe)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
@@ -1,70 +1,316 @@
+import os
+from bisect import bisect_right
+from collections import OrderedDict
 import pymupdf
 from PyQt6.QtGui import QImage, QPixmap
 from PyQt6.QtCore import QSize, Qt
+from logic import tracing
+
+DEFAULT_RENDER_CACHE_BYTES = 64 * 1024 * 1024
+
+# Colorspaces render_page() accepts: PyMuPDF colorspace and matching QImage format
+COLORSPACES = {
+    "rgb": (pymupdf.csRGB, QImage.Format.Format_RGB888),
+    "gray": (pymupdf.csGRAY, QImage.Format.Format_Grayscale8),
+}
+
+
+class PixmapCache:
+    """
+    LRU cache of rendered pages, bounded by the bytes of their pixels.
+
+    Keys are (document identity, page, zoom, colorspace); the document
+    identity is the source file's path, size and modification time, so a
+    page of a file that changed on disk is never served stale. Pixmaps
+    larger than `max_bytes` are not cached. Used on the GUI thread only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        # key -> (pixmap, size_in_bytes), least recently used first
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Returns the cached pixmap for key, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, pixmap):
+        size = pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (pixmap, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, (_, dropped) = self._entries.popitem(last=False)
+            self.total_bytes -= dropped
+
+    def invalidate(self, keep_documents=None):
+        """
+        Drops every entry, or only those of documents not in keep_documents
+        (a set of document identities).
+        """
+        if keep_documents is None:
+            self._entries.clear()
+            self.total_bytes = 0
+            return
+        for key in [key for key in self._entries if key[0] not in keep_documents]:
+            self._remove(key)
+
+    def stats(self):
+        """Returns hit/miss counters and current usage."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+        }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+
+def _document_identity(path, stat):
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def pixmap_to_qimage(pix, image_format):
+    """
+    Wraps a PyMuPDF pixmap's samples in a QImage without copying them.
+
+    The QImage reads straight from the pixmap's buffer, so it holds a
+    reference to `pix` to keep that buffer alive. Qt does not know about
+    that reference, though: a copy Qt makes of the QImage (e.g. in a
+    queued signal) would outlive the buffer. Use it right away - as in
+    QPixmap.fromImage(), which copies the pixels anyway - or call
+    .copy() for an image that owns its data.
+    """
+    image = QImage(pix.samples_mv, pix.width, pix.height, pix.stride, image_format)
+    image._samples_owner = pix
+    return image
+
 
 class PDFRenderer:
-    """Handles PDF rendering using PyMuPDF for preview generation"""
+    """
+    Handles PDF rendering using PyMuPDF for preview generation.
+
+    Pages are addressed through a page index, so the renderer can show
+    either one file (load_pdf) or a virtual merged document made of several
+    files (load_documents) without writing anything to disk. The index is a
+    list of segments, one per listed file: merged page N maps to
+    (source document, N - first page of its segment).
 
-    def __init__(self):
+    Rendered pages are kept in a PixmapCache of `cache_bytes` (0 turns it
+    off), so paging back and forth or switching tabs does not rasterize
+    the same page again. load_pdf() and close() empty it; load_documents()
+    keeps the pages of files that stay open.
+    """
+
+    def __init__(self, cache_bytes=DEFAULT_RENDER_CACHE_BYTES):
         self.current_doc = None
         self.current_path = None
+        # path -> (size, mtime, pymupdf.Document) for every open source file
+        self._open_docs = {}
+        # Page index: first merged page number of each segment, and its document
+        self._segment_starts = []
+        self._segment_docs = []
+        self._segment_identities = []
+        self._page_count = 0
+        self.render_cache = PixmapCache(cache_bytes)
 
+    @tracing.traced("renderer.load_pdf", "render")
     def load_pdf(self, file_path):
         """Open a PDF file and cache the document"""
-        # Close existing document if any
-        if self.current_doc:
-            self.current_doc.close()
+        # Close existing document(s) if any
+        self.close()
 
         # Open new document
         try:
+            identity = _document_identity(file_path, os.stat(file_path))
             self.current_doc = pymupdf.open(file_path)
             self.current_path = file_path
+            self._set_page_index([self.current_doc], [identity])
             return True
         except Exception as e:
             print(f"Error loading PDF: {e}")
+            self.close()
+            return False
+
+    @tracing.traced("renderer.load_documents", "render")
+    def load_documents(self, file_paths):
+        """
+        Show several PDFs as one virtual merged document.
+
+        Files that are already open and unchanged on disk are reused, so a
+        reorder of the merge list only rebuilds the page index. Files no
+        longer listed are closed.
+
+        Returns:
+            bool: False if any file could not be opened.
+        """
+        # load_documents replaces a single-file load
+        if self.current_doc:
+            self.current_doc.close()
             self.current_doc = None
             self.current_path = None
+
+        docs = []
+        identities = []
+        still_open = {}
+        try:
+            for path in file_paths:
+                stat = os.stat(path)
+                entry = still_open.get(path) or self._open_docs.get(path)
+                if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+                    entry = (stat.st_size, stat.st_mtime_ns, pymupdf.open(path))
+                still_open[path] = entry
+                docs.append(entry[2])
+                identities.append(_document_identity(path, stat))
+        except Exception as e:
+            print(f"Error loading PDF: {e}")
+            for path, entry in still_open.items():
+                if self._open_docs.get(path) is not entry:
+                    entry[2].close()
+            self.close()
             return False
 
+        for path, entry in self._open_docs.items():
+            if still_open.get(path) is not entry:
+                entry[2].close()
+        self._open_docs = still_open
+        self._set_page_index(docs, identities)
+        # Pages of the files still listed stay cached, wherever they moved
+        self.render_cache.invalidate(keep_documents=set(identities))
+        return True
+
+    def _set_page_index(self, docs, identities):
+        self._segment_starts = []
+        self._segment_docs = []
+        self._segment_identities = list(identities)
+        total = 0
+        for doc in docs:
+            self._segment_starts.append(total)
+            self._segment_docs.append(doc)
+            total += len(doc)
+        self._page_count = total
+
+    def _resolve(self, page_num):
+        """
+        Map a page number to (document, page number in that document,
+        document identity).
+        """
+        if page_num < 0 or page_num >= self._page_count:
+            return None, None, None
+        segment = bisect_right(self._segment_starts, page_num) - 1
+        return (self._segment_docs[segment], page_num - self._segment_starts[segment],
+                self._segment_identities[segment])
+
+    def page_source(self, page_num):
+        """
+        The file and 0-based page in that file behind a page number, e.g.
+        to render it elsewhere (see logic/render_service.py).
+
+        Returns:
+            tuple: (absolute path, page number), or (None, None).
+        """
+        doc, source_page, identity = self._resolve(page_num)
+        if doc is None:
+            return None, None
+        return identity[0], source_page
+
+    def has_document(self):
+        """True if a file (or a virtual merged document) is loaded"""
+        return bool(self._segment_docs)
+
     def get_page_count(self):
         """Return total pages in current document"""
-        return len(self.current_doc) if self.current_doc else 0
+        return self._page_count
 
-    def render_page(self, page_num, zoom=1.0):
+    def render_page(self, page_num, zoom=1.0, colorspace="rgb"):
         """
         Render a single page to QPixmap
         Args:
             page_num (int): 0-indexed page number
             zoom (float): Scaling factor (1.0 = 100%)
+            colorspace (str): "rgb" or "gray" (see COLORSPACES)
         Returns:
-            QPixmap: Rendered page image
+            QPixmap: Rendered page image (possibly shared with the render
+            cache; QPixmap copies on write, so callers may still modify it)
         """
-        if not self.current_doc or page_num < 0 or page_num >= len(self.current_doc):
+        doc, source_page, identity = self._resolve(page_num)
+        if doc is None:
             return None
 
-        try:
-            # Get page
-            page = self.current_doc[page_num]
+        key = (identity, source_page, zoom, colorspace)
+        cached = self.render_cache.get(key)
+        if cached is not None:
+            return cached
 
-            # Create matrix for scaling
-            mat = pymupdf.Matrix(zoom, zoom)
-
-            # Render to pixmap
-            pix = page.get_pixmap(matrix=mat)
+        try:
+            image = self._render_image(doc, source_page, page_num, zoom, colorspace)
+            with tracing.span("pixmap_convert", "render", width=image.width(),
+                              height=image.height()):
+                # The one copy, straight from PyMuPDF's samples buffer
+                qpixmap = QPixmap.fromImage(image)
+            self.render_cache.put(key, qpixmap)
+            return qpixmap
+        except Exception as e:
+            print(f"Error rendering page {page_num}: {e}")
+            return None
 
-            # Convert to QImage - must copy samples data as memoryview doesn't persist
-            img_data = bytes(pix.samples)
-            qimage = QImage(img_data, pix.width, pix.height,
-                           pix.stride, QImage.Format.Format_RGB888)
+    def render_page_image(self, page_num, zoom=1.0, colorspace="rgb"):
+        """
+        Render a single page to a QImage that owns its pixels.
 
-            # Convert to QPixmap (this copies the data, so img_data can be freed)
-            qpixmap = QPixmap.fromImage(qimage)
+        Unlike QPixmap, a QImage may be created and used off the GUI
+        thread and passed to it through a signal. Not cached. The renderer
+        itself is still not thread-safe: use a renderer (and its
+        documents) from one thread at a time.
 
-            return qpixmap
+        Args:
+            page_num (int): 0-indexed page number
+            zoom (float): Scaling factor (1.0 = 100%)
+            colorspace (str): "rgb" or "gray" (see COLORSPACES)
+        Returns:
+            QImage: Rendered page image, or None on error
+        """
+        doc, source_page, _ = self._resolve(page_num)
+        if doc is None:
+            return None
+        try:
+            image = self._render_image(doc, source_page, page_num, zoom, colorspace)
+            with tracing.span("pixmap_convert", "render", width=image.width(),
+                              height=image.height()):
+                return image.copy()
         except Exception as e:
             print(f"Error rendering page {page_num}: {e}")
             return None
 
+    def _render_image(self, doc, source_page, page_num, zoom, colorspace):
+        """Rasterizes one page; returns a QImage over the pixmap's buffer."""
+        pymupdf_colorspace, image_format = COLORSPACES[colorspace]
+        page = doc[source_page]
+
+        # Create matrix for scaling
+        mat = pymupdf.Matrix(zoom, zoom)
+
+        with tracing.span("render", "render", page=page_num, zoom=zoom):
+            pix = page.get_pixmap(matrix=mat, colorspace=pymupdf_colorspace)
+        return pixmap_to_qimage(pix, image_format)
+
     def render_thumbnail(self, page_num, max_width=200):
         """
         Render page as thumbnail with fixed max width
@@ -74,12 +320,13 @@ class PDFRenderer:
         Returns:
             QPixmap: Rendered thumbnail image
         """
-        if not self.current_doc or page_num < 0 or page_num >= len(self.current_doc):
+        doc, source_page, _ = self._resolve(page_num)
+        if doc is None:
             return None
 
         try:
             # Get page
-            page = self.current_doc[page_num]
+            page = doc[source_page]
 
             # Calculate zoom to fit max_width
             zoom = max_width / page.rect.width
@@ -91,8 +338,13 @@ class PDFRenderer:
             return None
 
     def close(self):
-        """Close current document and free resources"""
+        """Close current document(s) and free resources"""
         if self.current_doc:
             self.current_doc.close()
-            self.current_doc = None
-            self.current_path = None
+        for _, _, doc in self._open_docs.values():
+            doc.close()
+        self.current_doc = None
+        self.current_path = None
+        self._open_docs = {}
+        self._set_page_index([], [])
+        self.render_cache.invalidate()
@@ -0,0 +1,95 @@
+import os
+import threading
+from collections import OrderedDict
+from logic import tracing
+from logic.pdf_input import open_reader
+
+
+class ReaderCache:
+    """
+    LRU cache of parsed PdfReader objects.
+
+    Entries are looked up by absolute path and are only reused while the
+    file's size and modification time still match what they were when the
+    reader was built, so a file that changes on disk is simply parsed again.
+
+    pypdf reads the whole input into memory, so an entry's cost is taken to
+    be its file size. The cache stays under both `max_entries` and
+    `max_bytes`; files larger than `max_bytes` are never cached. With
+    use_mmap the readers map their files instead (see logic/pdf_input.py);
+    the cost is still counted as the file size, since that is what the
+    mapping can pull into the page cache.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=512 * 1024 * 1024, use_mmap=False):
+        self.use_mmap = use_mmap
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        # path -> (signature, reader, size_in_bytes), least recently used first
+        self._entries = OrderedDict()
+        # Split/merge may run off the GUI thread while the preview reads info
+        self._lock = threading.Lock()
+
+    def get(self, file_path):
+        """Returns a reader for file_path, parsing it only if needed."""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                if entry[0] == signature:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return entry[1]
+                # The file changed on disk since it was parsed
+                self._remove(path)
+            self.misses += 1
+
+        with tracing.span("parse", "logic", file=os.path.basename(path), bytes=stat.st_size):
+            reader = open_reader(path, self.use_mmap)
+
+        if stat.st_size <= self.max_bytes:
+            with self._lock:
+                if path in self._entries:
+                    self._remove(path)
+                self._entries[path] = (signature, reader, stat.st_size)
+                self.total_bytes += stat.st_size
+                self._trim()
+        return reader
+
+    def invalidate(self, file_path=None):
+        """Drops one file from the cache, or everything if no path is given."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self.total_bytes = 0
+            else:
+                self._remove(os.path.abspath(file_path))
+
+    def stats(self):
+        """Returns hit/miss counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+            }
+
+    def _remove(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def _trim(self):
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self.total_bytes > self.max_bytes):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
@@ -0,0 +1,218 @@
+"""
+Page rendering in worker processes, for thumbnail grids.
+
+Rendering a few hundred thumbnails on the GUI thread freezes the window,
+and PyMuPDF documents must not be shared between threads. A RenderService
+hands render tasks to a pool of worker processes instead. Each worker
+opens its own documents (and keeps a few open for the next task) and
+sends the raw samples back.
+
+A task is a (path, page, width) tuple: 0-based page of that file,
+rendered to `width` pixels wide. A result is (width, height, stride,
+samples), RGB with 3 bytes per pixel. Results are delivered as they
+finish, through the on_result callback, which runs on a pool thread (see
+gui/workers.py for the bridge to the GUI thread).
+
+Pending tasks start in priority order: submit() appends, prioritize()
+moves tasks to the front (e.g. the ones on screen) and discard() drops
+tasks nobody needs any more (scrolled away). Only a few tasks per worker
+are in the pool at any time, so a new priority takes effect within a
+task or two, and cancel() drops everything not yet started and discards
+the results of what is still running.
+
+With a ThumbnailCache (see thumbnail_cache.py) workers look each page up
+on disk first and store what they render, so a document seen before fills
+its grid from small PNGs instead of rendering again.
+
+This module does not import Qt: workers are spawned rather than forked
+from a process running Qt, and only need this module and PyMuPDF.
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logic.thumbnail_cache import FingerprintCache, ThumbnailCache
+
+# Per worker process: path -> (size, mtime, document), least recently used first
+_worker_docs = OrderedDict()
+_WORKER_MAX_DOCS = 8
+# Per worker process: (directory, max_bytes) -> ThumbnailCache, and the
+# content fingerprints of the files rendered (a FingerprintCache)
+_worker_caches = {}
+_worker_fingerprints = FingerprintCache()
+
+
+def _worker_document(path):
+    """The worker's open document for path, reopened if the file changed."""
+    import pymupdf
+
+    stat = os.stat(path)
+    entry = _worker_docs.get(path)
+    if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+        if entry is not None:
+            entry[2].close()
+        entry = (stat.st_size, stat.st_mtime_ns, pymupdf.open(path))
+        _worker_docs[path] = entry
+    _worker_docs.move_to_end(path)
+    while len(_worker_docs) > _WORKER_MAX_DOCS:
+        _, (_, _, doc) = _worker_docs.popitem(last=False)
+        doc.close()
+    return entry[2]
+
+
+def _render_task(path, page_num, width, cache_args=None):
+    """
+    Process pool entry point: renders one page to `width` pixels wide.
+    cache_args is (directory, max_bytes) of a ThumbnailCache, or None.
+    """
+    import pymupdf
+
+    cache = fingerprint = None
+    if cache_args is not None:
+        cache = _worker_caches.get(cache_args)
+        if cache is None:
+            cache = _worker_caches[cache_args] = ThumbnailCache(*cache_args)
+        fingerprint = _worker_fingerprints.get(path)
+        png = cache.get(fingerprint, page_num, width)
+        if png is not None:
+            try:
+                pix = pymupdf.Pixmap(png)
+            except Exception:
+                pix = None
+            if pix is not None and pix.n == 3 and not pix.alpha:
+                return pix.width, pix.height, pix.stride, pix.samples
+            # Unreadable (e.g. a truncated file from a full disk): render again
+            cache.discard(fingerprint, page_num, width)
+
+    page = _worker_document(path)[page_num]
+    zoom = width / page.rect.width
+    pix = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), colorspace=pymupdf.csRGB,
+                          alpha=False)
+    if cache is not None:
+        cache.put(fingerprint, page_num, width, pix.tobytes("png"))
+    return pix.width, pix.height, pix.stride, pix.samples
+
+
+class RenderService:
+    """
+    Renders pages in worker processes, highest priority first.
+
+    Args:
+        workers (int): Worker processes. None uses one per CPU, at most 4.
+        on_result: Called as on_result(task, result) for every finished task
+            (on a pool thread).
+        on_error: Called as on_error(task, message) for a task that failed.
+        thumbnail_cache (ThumbnailCache): On-disk cache the workers read
+            and fill, or None to always render.
+
+    The pool starts with the first task and is reused until shutdown().
+    """
+
+    # Tasks handed to the pool per worker; more only delays a new priority
+    TASKS_PER_WORKER = 2
+
+    def __init__(self, workers=None, on_result=None, on_error=None, thumbnail_cache=None):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.on_result = on_result
+        self.on_error = on_error
+        # Workers keep their own ThumbnailCache; they only need its settings
+        self._cache_args = None
+        if thumbnail_cache is not None:
+            self._cache_args = (thumbnail_cache.directory, thumbnail_cache.max_bytes)
+        self._pool = None
+        self._lock = threading.Lock()
+        # Tasks not handed to the pool yet, next first (values unused)
+        self._pending = OrderedDict()
+        # future -> (task, generation, pool); cancel() starts a new generation
+        self._running = {}
+        self._generation = 0
+
+    def submit(self, tasks):
+        """Queues tasks behind those already pending; duplicates are ignored."""
+        with self._lock:
+            for task in tasks:
+                self._pending[task] = None
+            started = self._fill()
+        self._watch(started)
+
+    def prioritize(self, tasks):
+        """Moves pending tasks to the front, in the given order."""
+        with self._lock:
+            for task in reversed(list(tasks)):
+                if task in self._pending:
+                    self._pending.move_to_end(task, last=False)
+
+    def discard(self, tasks):
+        """Drops the given tasks if they have not started yet."""
+        with self._lock:
+            for task in tasks:
+                self._pending.pop(task, None)
+
+    def cancel(self):
+        """Drops every pending task; running ones finish unreported."""
+        with self._lock:
+            self._pending.clear()
+            self._generation += 1
+
+    def busy(self):
+        """True while tasks are pending or running."""
+        with self._lock:
+            return bool(self._pending or self._running)
+
+    def shutdown(self):
+        """Cancels everything and stops the worker processes."""
+        self.cancel()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fill(self):
+        """Hands pending tasks to the pool (lock held). Returns the new futures."""
+        started = []
+        while self._pending and len(self._running) < self.workers * self.TASKS_PER_WORKER:
+            task, _ = self._pending.popitem(last=False)
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            future = self._pool.submit(_render_task, *task, self._cache_args)
+            self._running[future] = (task, self._generation, self._pool)
+            started.append(future)
+        return started
+
+    def _watch(self, futures):
+        # Outside the lock: a future that is already done calls back at once
+        for future in futures:
+            future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        error = None if future.cancelled() else future.exception()
+        failed = []
+        with self._lock:
+            task, generation, pool = self._running.pop(future)
+            current = generation == self._generation and not future.cancelled()
+            if isinstance(error, BrokenProcessPool):
+                # A worker died (or could not start). Fail what is pending
+                # rather than respawning in a loop; the next submit() starts
+                # a new pool.
+                if pool is self._pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+                if current:
+                    failed = list(self._pending)
+                self._pending.clear()
+            started = self._fill()
+        self._watch(started)
+
+        if not current:
+            return
+        if error is None:
+            if self.on_result:
+                self.on_result(task, future.result())
+        elif self.on_error:
+            message = str(error) or type(error).__name__
+            for failed_task in [task] + failed:
+                self.on_error(failed_task, message)
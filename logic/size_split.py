@@ -0,0 +1,141 @@
+"""
+Grouping pages by output size, for split_pdf(max_bytes=...).
+
+Each page is measured once: its own dictionary plus every indirect object
+it pulls in (content streams, fonts, images, ...). Objects are identified
+by object number, so a font shared by 50 pages is measured once and only
+counted once per output file - the same way PdfWriter writes it.
+"""
+
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+# Header, catalog, page tree, info dictionary and trailer of a pypdf output,
+# rounded up
+FILE_OVERHEAD = 1024
+# "N 0 obj\n" ... "\nendobj\n" plus the 20-byte xref entry of one object
+OBJECT_OVERHEAD = 40
+# The page's "N 0 R" entry in the output's /Kids array
+KIDS_ENTRY = 12
+
+
+class _ByteCounter:
+    """Write-only sink that only counts, so objects can be measured without copying."""
+
+    def __init__(self):
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data)
+
+
+def serialized_size(obj):
+    """Bytes obj takes when written as a PDF object (references as "N 0 R")."""
+    counter = _ByteCounter()
+    obj.write_to_stream(counter)
+    return counter.count
+
+
+def estimate_page_sizes(reader):
+    """
+    Measures every page of a reader in a single pass.
+
+    Args:
+        reader (PdfReader): The document.
+
+    Returns:
+        tuple: (page_bytes, page_refs, object_bytes). page_bytes[i] is the
+        size of page i's own dictionary, page_refs[i] the set of object
+        numbers it references (directly or through other objects), and
+        object_bytes maps each of those object numbers to its size.
+    """
+    pages = reader.pages
+    # Links and annotations can point at other pages; those are not copied
+    # along with this page, so the walk stops there
+    page_ids = {page.indirect_reference.idnum for page in pages
+                if page.indirect_reference is not None}
+    object_bytes = {}
+    page_bytes = []
+    page_refs = []
+
+    for page in pages:
+        refs = set()
+        stack = [page.raw_get(key) for key in page if key != "/Parent"]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, IndirectObject):
+                idnum = obj.idnum
+                if idnum in refs or idnum in page_ids:
+                    continue
+                refs.add(idnum)
+                target = obj.get_object()
+                if idnum not in object_bytes:
+                    object_bytes[idnum] = serialized_size(target) + OBJECT_OVERHEAD
+                stack.append(target)
+            elif isinstance(obj, DictionaryObject):
+                stack.extend(obj.raw_get(key) for key in obj if key != "/Parent")
+            elif isinstance(obj, ArrayObject):
+                stack.extend(obj)
+
+        # Measured with /Parent: the copy gets a /Parent of its own
+        page_bytes.append(serialized_size(page) + OBJECT_OVERHEAD + KIDS_ENTRY)
+        page_refs.append(refs)
+
+    return page_bytes, page_refs, object_bytes
+
+
+def pack_pages_by_size(page_bytes, page_refs, object_bytes, max_bytes):
+    """
+    Greedily packs consecutive pages into groups whose estimated file size
+    stays under max_bytes.
+
+    A page that is over the limit on its own still gets a group (it cannot
+    be split further); such groups are reported as oversized.
+
+    Returns:
+        tuple: (groups, oversized) - a list of ranges of 0-based page
+        indices, in page order, and the number of oversized groups.
+    """
+    groups = []
+    oversized = 0
+    start = 0
+    total = FILE_OVERHEAD
+    seen = set()
+
+    for index, refs in enumerate(page_refs):
+        new_refs = refs - seen
+        added = page_bytes[index] + sum(object_bytes[idnum] for idnum in new_refs)
+        if index > start and total + added > max_bytes:
+            groups.append(range(start, index))
+            start = index
+            seen = set()
+            new_refs = refs
+            added = page_bytes[index] + sum(object_bytes[idnum] for idnum in refs)
+            total = FILE_OVERHEAD
+        seen |= new_refs
+        total += added
+        if index == start and total > max_bytes:
+            oversized += 1
+
+    if start < len(page_refs):
+        groups.append(range(start, len(page_refs)))
+    return groups, oversized
+
+
+def estimate_group_size(page_indices, page_bytes, page_refs, object_bytes):
+    """
+    Estimated size of one output file holding the given pages, with each
+    shared object counted once.
+
+    Args:
+        page_indices: 0-based page indices (any iterable, e.g. a range).
+        page_bytes, page_refs, object_bytes: As returned by estimate_page_sizes().
+
+    Returns:
+        int: Bytes.
+    """
+    total = FILE_OVERHEAD
+    seen = set()
+    for index in page_indices:
+        total += page_bytes[index]
+        seen |= page_refs[index]
+    return total + sum(object_bytes[idnum] for idnum in seen)
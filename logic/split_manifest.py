@@ -0,0 +1,205 @@
+"""
+Output manifests for incremental splits, split_pdf(incremental=True).
+
+A split records in its output folder what it wrote: the input's content
+hash, the settings that shape the output bytes (write profile, engine and
+engine version), the range expression, and the page group, size and
+SHA-256 of every output file. The next split of the same input into the
+same folder reads it back and skips every output that
+
+    - was written from the same input content with the same settings,
+    - covers the same pages (by output file name), and
+    - is still on disk with the recorded size and hash,
+
+so only missing or stale files are written again. Changing the range
+expression only rewrites the files whose pages changed; outputs the new
+split no longer produces are deleted (only files the manifest lists).
+Shards of one plan (see logic/split_plan.py) may share a folder: a shard
+leaves the other shards' files and entries alone.
+
+The manifest is named .<input file name>.split-manifest.json and is
+written atomically once the split has finished, so an interrupted split
+just redoes the unfinished files next time. Shards may also run at the
+same time: save() re-reads the manifest under a lock file and only
+replaces the entries of the files this split kept, wrote or removed, so
+entries another shard saved in the meantime survive.
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from logic.output_writer import atomic_output
+
+MANIFEST_FORMAT = 1
+_HASH_CHUNK = 1024 * 1024
+
+# A save holds the lock for milliseconds; a lock this old was left behind
+# by a process that died while holding it
+LOCK_STALE_SECONDS = 30
+_LOCK_POLL_SECONDS = 0.01
+
+
+def manifest_path(output_folder, input_path):
+    """Where the manifest of splitting input_path into output_folder lives."""
+    return os.path.join(output_folder, f".{os.path.basename(input_path)}.split-manifest.json")
+
+
+def file_digest(path):
+    """SHA-256 of a file's content, as hex."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _locked(path):
+    """Holds <path>.lock (created exclusively) for the with-block."""
+    lock_path = path + ".lock"
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+            break
+        except FileExistsError:
+            pass
+        try:
+            if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                os.remove(lock_path)
+                continue
+        except OSError:
+            # Released (or broken by someone else) in the meantime
+            continue
+        time.sleep(_LOCK_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def _read(path):
+    """(settings, outputs) of the manifest file at path, or (None, {})."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") == MANIFEST_FORMAT and isinstance(data.get("outputs"), dict):
+            return data.get("settings"), data["outputs"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None, {}
+
+
+def _pages_key(page_indices):
+    """[first, last, step] of a group, 0-based; equal groups give equal keys."""
+    return [page_indices[0], page_indices[-1],
+            page_indices.step if isinstance(page_indices, range) else 1]
+
+
+class SplitManifest:
+    """
+    What one incremental split wrote.
+
+    Args:
+        path (str): The manifest file (see manifest_path()).
+        settings (dict): Everything besides the page group that decides an
+            output's bytes; outputs recorded under other settings are stale.
+        info (dict): Stored for reference only (range expression, ...).
+    """
+
+    def __init__(self, path, settings, info=None):
+        self.path = path
+        self.settings = settings
+        self.info = info or {}
+        # file name -> {"pages": [...], "bytes": int, "sha256": str}
+        self.outputs = {}
+        # What the previous run recorded; outputs are carried over as they
+        # pass is_current()
+        self._previous = {}
+        self._previous_settings = None
+        # Files this split decided about (kept, wrote or removed); save()
+        # takes every other entry from the manifest on disk
+        self._claimed = set()
+
+    @classmethod
+    def load(cls, path, settings, info=None):
+        """
+        Reads the manifest at path. A missing, unreadable or differently
+        configured manifest leaves nothing reusable, except the list of
+        files it recorded (so they can still be cleaned up).
+        """
+        manifest = cls(path, settings, info)
+        manifest._previous_settings, manifest._previous = _read(path)
+        return manifest
+
+    def is_current(self, output_folder, file_name, page_indices):
+        """
+        True if file_name can be kept: recorded with these settings and
+        pages, and still intact on disk. A kept output is carried over into
+        this manifest.
+        """
+        entry = self._previous.get(file_name)
+        if (entry is None or self._previous_settings != self.settings
+                or entry.get("pages") != _pages_key(page_indices)):
+            return False
+        path = os.path.join(output_folder, file_name)
+        try:
+            # Size first: a stat is cheap, hashing reads the whole file
+            if os.path.getsize(path) != entry.get("bytes"):
+                return False
+            if file_digest(path) != entry.get("sha256"):
+                return False
+        except OSError:
+            return False
+        self.outputs[file_name] = entry
+        self._claimed.add(file_name)
+        return True
+
+    def record(self, file_name, page_indices, num_bytes, sha256):
+        """Adds an output written by this split."""
+        self.outputs[file_name] = {"pages": _pages_key(page_indices), "bytes": num_bytes,
+                                   "sha256": sha256}
+        self._claimed.add(file_name)
+
+    def forget(self, file_name):
+        """Drops an output this split removed, also from the manifest on disk."""
+        self.outputs.pop(file_name, None)
+        self._claimed.add(file_name)
+
+    def keep(self, file_name):
+        """
+        Carries a recorded output over unchecked (e.g. one of another shard).
+        save() prefers a newer entry for it from the manifest on disk.
+        """
+        if file_name in self._previous and self._previous_settings == self.settings:
+            self.outputs[file_name] = self._previous[file_name]
+
+    def obsolete(self, planned_names):
+        """Files the previous split recorded that this split does not produce."""
+        # Plain names only: a hand-edited manifest must not reach outside the folder
+        return [name for name in self._previous
+                if name not in planned_names and name == os.path.basename(name)]
+
+    def save(self):
+        """
+        Writes the manifest. Entries of files this split did not decide
+        about are taken from the manifest as it is on disk now (if it was
+        saved with the same settings), so shards running at the same time
+        do not drop each other's entries.
+        """
+        with _locked(self.path):
+            outputs = dict(self.outputs)
+            settings, on_disk = _read(self.path)
+            if settings == self.settings:
+                for file_name, entry in on_disk.items():
+                    if file_name not in self._claimed:
+                        outputs[file_name] = entry
+            data = {"format": MANIFEST_FORMAT, "settings": self.settings, "info": self.info,
+                    "outputs": outputs}
+            with atomic_output(self.path) as f:
+                f.write(json.dumps(data, indent=1).encode("utf-8"))
+        self.outputs = outputs
@@ -0,0 +1,189 @@
+"""
+Split plans: what a split will write, worked out without writing anything.
+
+PDFManager.plan_split() resolves the page groups of a split, the file
+name of each output and (optionally) an estimated size per output into a
+SplitPlan. A plan is plain data: it can be reviewed, saved as JSON,
+divided into shards for several machines and run later with
+split_pdf(plan=...).
+
+Page groups and output names are fixed by the plan. The input file and
+the output folder are given again when it runs, so the same plan works
+on a machine where the paths differ; it only refuses an input whose page
+count differs from the planned one.
+"""
+
+import json
+
+PLAN_FORMAT = 1
+
+
+def output_filename(file_prefix, page_indices):
+    """
+    Builds the output filename for one split group.
+    Single page: split_page_1.pdf, range: split_pages_1-3.pdf,
+    stepped range ("1-20:2", "odd"): split_pages_1-19_step2.pdf, so it
+    does not collide with the plain range over the same ends.
+    """
+    if len(page_indices) == 1:
+        suffix = f"page_{page_indices[0] + 1}"
+    else:
+        first = page_indices[0] + 1
+        last = page_indices[-1] + 1
+        suffix = f"pages_{first}-{last}"
+        if isinstance(page_indices, range) and page_indices.step != 1:
+            suffix += f"_step{page_indices.step}"
+    return f"{file_prefix}_{suffix}.pdf"
+
+
+class SplitPlan:
+    """
+    The outputs of one split, in order.
+
+    Args:
+        input_name (str): File name of the planned input (for reference).
+        total_pages (int): Page count of that input.
+        groups: The page groups, each a range of 0-based page indices. May
+            be a lazy PageRanges; it is only turned into a list when the
+            plan is sharded or saved.
+        file_prefix (str): Names outputs via output_filename(), unless
+            `names` gives them explicitly (as in a loaded plan).
+        names (list): Optional file name per group.
+        sizes (list): Optional estimated bytes per group.
+        oversized (int): Groups estimated over the split's max_bytes.
+        shard (tuple): (index, count) when this plan is one shard of another.
+    """
+
+    def __init__(self, input_name, total_pages, groups, file_prefix="split", names=None,
+                 sizes=None, oversized=0, shard=None):
+        self.input_name = input_name
+        self.total_pages = total_pages
+        self.groups = groups
+        self.file_prefix = file_prefix
+        self.names = names
+        self.sizes = sizes
+        self.oversized = oversized
+        self.shard_info = shard
+
+    def __len__(self):
+        """Number of output files."""
+        return len(self.groups)
+
+    def __bool__(self):
+        return bool(self.groups)
+
+    def __iter__(self):
+        """Yields (file_name, page_indices) per output, in order."""
+        if self.names is not None:
+            yield from zip(self.names, self.groups)
+        else:
+            for page_indices in self.groups:
+                yield output_filename(self.file_prefix, page_indices), page_indices
+
+    def page_count(self):
+        """Pages written over all outputs."""
+        return sum(len(page_indices) for page_indices in self.groups)
+
+    def estimated_bytes(self):
+        """Estimated disk space for all outputs, or None without size estimates."""
+        return sum(self.sizes) if self.sizes is not None else None
+
+    def shard(self, index, count):
+        """
+        One of `count` contiguous parts of the plan, for running a split on
+        several machines. Parts are balanced by estimated size when the
+        plan has estimates, by page count otherwise.
+
+        Args:
+            index (int): 0-based shard number.
+            count (int): Number of shards.
+
+        Returns:
+            SplitPlan: The outputs of that shard (possibly none).
+        """
+        if not 0 <= index < count:
+            raise ValueError(f"Shard {index} out of range for {count} shards")
+        groups = list(self.groups)
+        names = [name for name, _ in self] if self.names is None else self.names
+        weights = self.sizes if self.sizes is not None else [len(g) for g in groups]
+        total = sum(weights)
+
+        # Shard k ends where the running total first reaches (k+1)/count of the whole
+        bounds = [0]
+        running = 0
+        for position, weight in enumerate(weights, start=1):
+            running += weight
+            while len(bounds) < count and running * count >= total * len(bounds):
+                bounds.append(position)
+        while len(bounds) <= count:
+            bounds.append(len(groups))
+        start, stop = bounds[index], bounds[index + 1]
+
+        return SplitPlan(self.input_name, self.total_pages, groups[start:stop],
+                         self.file_prefix, names[start:stop],
+                         self.sizes[start:stop] if self.sizes is not None else None,
+                         shard=(index, count))
+
+    def to_dict(self):
+        """JSON-ready form. Page numbers are 1-based and inclusive."""
+        outputs = []
+        for number, (name, page_indices) in enumerate(self):
+            entry = {"file": name, "first_page": page_indices[0] + 1,
+                     "last_page": page_indices[-1] + 1}
+            if isinstance(page_indices, range) and page_indices.step != 1:
+                entry["step"] = page_indices.step
+            if self.sizes is not None:
+                entry["estimated_bytes"] = self.sizes[number]
+            outputs.append(entry)
+        return {
+            "format": PLAN_FORMAT,
+            "input": self.input_name,
+            "total_pages": self.total_pages,
+            "files": len(outputs),
+            "pages": self.page_count(),
+            "estimated_bytes": self.estimated_bytes(),
+            "oversized": self.oversized,
+            "shard": list(self.shard_info) if self.shard_info else None,
+            "outputs": outputs,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuilds a plan from to_dict() output.
+
+        Raises:
+            ValueError: If the data is not a plan this version understands.
+        """
+        if not isinstance(data, dict) or data.get("format") != PLAN_FORMAT:
+            raise ValueError("Not a split plan (or an unsupported plan format)")
+        try:
+            names = []
+            groups = []
+            sizes = []
+            for entry in data["outputs"]:
+                step = int(entry.get("step", 1))
+                first, last = int(entry["first_page"]), int(entry["last_page"])
+                if first < 1 or last > data["total_pages"] or step < 1:
+                    raise ValueError(f"Pages out of range in {entry['file']!r}")
+                names.append(str(entry["file"]))
+                groups.append(range(first - 1, last, step))
+                sizes.append(entry.get("estimated_bytes"))
+            return cls(data.get("input"), int(data["total_pages"]), groups, names=names,
+                       sizes=sizes if None not in sizes else None,
+                       oversized=int(data.get("oversized") or 0),
+                       shard=tuple(data["shard"]) if data.get("shard") else None)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed split plan: {e}") from None
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def __repr__(self):
+        return f"SplitPlan({self.input_name!r}, files={len(self)}, pages={self.page_count()})"
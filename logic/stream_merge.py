@@ -0,0 +1,188 @@
+import copy
+import time
+from pypdf import PdfReader
+from logic.pdf_input import open_input
+from pypdf.generic import (ArrayObject, DictionaryObject, IndirectObject,
+                           NameObject, NullObject, NumberObject, StreamObject)
+from logic.dedupe import content_digest, serialize_stream
+
+# Object numbers reserved for the output's own document structure.
+# Everything copied from the inputs is numbered from FIRST_FREE_ID upwards.
+CATALOG_ID = 1
+PAGES_ID = 2
+FIRST_FREE_ID = 3
+
+
+class StreamingMergeWriter:
+    """
+    Writes a merged PDF object by object instead of building it in memory.
+
+    pypdf's PdfWriter clones every page (and everything it references) into
+    the writer and only serializes at the very end, so memory grows with the
+    total size of all inputs. This writer instead walks one input at a time:
+    each page and the objects reachable from it are renumbered, written to the
+    output straight away, and the reader is closed before the next input is
+    opened.
+
+    Memory bound:
+        At most ONE input reader is alive at any time. Peak memory is therefore
+        roughly the parsed size of the largest single input, plus a fixed
+        ~100 bytes per object written so far (its xref offset and, for pages,
+        its reference in the final page tree). It does not depend on how many
+        inputs are merged or on their total size.
+
+    Limitations:
+        Only pages are carried over. Document-level data (bookmarks, named
+        destinations, form fields, metadata) is not copied.
+
+    With dedupe=True, streams (font files, images, ICC profiles, ...) are
+    hashed with content_digest() as they are met, and identical copies from
+    later inputs reuse the object already written. That costs about 100
+    bytes per unique stream on top of the bound above.
+    """
+
+    def __init__(self, output_stream, dedupe=False, use_mmap=False):
+        self.stream = output_stream
+        self.use_mmap = use_mmap
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = FIRST_FREE_ID
+
+        self.dedupe = dedupe
+        self._stream_ids = {}  # content digest of a written stream -> its object number
+        self._digest_memo = {}  # per-input cache for content_digest()
+        self.dedupe_stats = {"duplicates": 0, "bytes_saved": 0, "seconds": 0.0}
+
+        self.stream.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def append(self, input_path, on_page=None):
+        """
+        Copies every page of one input into the output.
+        The input file is read through an open handle or, with use_mmap, a
+        read-only memory map (not loaded into memory up front) and released
+        as soon as its pages are committed.
+        on_page, if given, is called after each page has been written.
+        """
+        with open_input(input_path, self.use_mmap) as f:
+            reader = PdfReader(f)
+            self._digest_memo = {}
+            # (idnum, generation) in this input -> object number in the output.
+            # Pages are numbered first so that links between pages resolve to
+            # the copied page rather than dragging in the old page tree.
+            id_map = {}
+            pages = list(reader.pages)
+            page_ids = []
+            for page in pages:
+                page_id = self._allocate()
+                ref = page.indirect_reference
+                # Inline or repeated pages just get their own copy
+                if ref is not None and self._key(ref) not in id_map:
+                    id_map[self._key(ref)] = page_id
+                page_ids.append(page_id)
+
+            for page, page_id in zip(pages, page_ids):
+                queue = []
+                # Leave /Parent out: it would pull in the input's page tree
+                page_dict = DictionaryObject(
+                    (key, value) for key, value in page.items() if key != "/Parent"
+                )
+                page_copy = self._remap(page_dict, id_map, queue)
+                # Re-parent the page into our own page tree
+                page_copy[NameObject("/Parent")] = IndirectObject(PAGES_ID, 0, None)
+                self._write_object(page_id, page_copy)
+                self.page_ids.append(page_id)
+
+                # Write everything this page pulled in (fonts, images, ...)
+                while queue:
+                    ref = queue.pop()
+                    obj = ref.get_object()
+                    if obj is None:
+                        obj = NullObject()
+                    self._write_object(id_map[self._key(ref)],
+                                       self._remap(obj, id_map, queue))
+                if on_page:
+                    on_page()
+            reader.close()
+
+    def close(self):
+        """Writes the page tree, catalog, xref table and trailer."""
+        pages = DictionaryObject()
+        pages[NameObject("/Type")] = NameObject("/Pages")
+        pages[NameObject("/Kids")] = ArrayObject(
+            IndirectObject(page_id, 0, None) for page_id in self.page_ids
+        )
+        pages[NameObject("/Count")] = NumberObject(len(self.page_ids))
+        self._write_object(PAGES_ID, pages)
+
+        catalog = DictionaryObject()
+        catalog[NameObject("/Type")] = NameObject("/Catalog")
+        catalog[NameObject("/Pages")] = IndirectObject(PAGES_ID, 0, None)
+        self._write_object(CATALOG_ID, catalog)
+
+        xref_offset = self.stream.tell()
+        size = self.next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for idnum in range(1, size):
+            lines.append(f"{self.offsets[idnum]:010d} 00000 n \n")
+        self.stream.write("".join(lines).encode("ascii"))
+        self.stream.write(
+            f"trailer\n<< /Size {size} /Root {CATALOG_ID} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+        self.stream.flush()
+
+    def _allocate(self):
+        idnum = self.next_id
+        self.next_id += 1
+        return idnum
+
+    def _key(self, ref):
+        return (ref.idnum, ref.generation)
+
+    def _remap(self, obj, id_map, queue):
+        """
+        Returns a shallow copy of obj with every indirect reference renumbered
+        into the output's numbering. Objects seen for the first time are
+        queued for writing. The reader's own objects are never modified, since
+        parsed objects can be shared (e.g. inherited /Resources).
+        """
+        if isinstance(obj, IndirectObject):
+            key = self._key(obj)
+            if key not in id_map:
+                digest = self._stream_digest(obj) if self.dedupe else None
+                if digest is not None and digest in self._stream_ids:
+                    # Identical to a stream that was already written
+                    id_map[key] = self._stream_ids[digest]
+                    self.dedupe_stats["duplicates"] += 1
+                    self.dedupe_stats["bytes_saved"] += len(serialize_stream(obj.get_object()))
+                else:
+                    id_map[key] = self._allocate()
+                    queue.append(obj)
+                    if digest is not None:
+                        self._stream_ids[digest] = id_map[key]
+            return IndirectObject(id_map[key], 0, None)
+        if isinstance(obj, DictionaryObject):
+            # Covers StreamObject too: copy.copy keeps the stream data
+            new_obj = copy.copy(obj)
+            for key, value in obj.items():
+                new_obj[key] = self._remap(value, id_map, queue)
+            return new_obj
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._remap(value, id_map, queue) for value in obj)
+        return obj
+
+    def _stream_digest(self, ref):
+        """content_digest() of a referenced stream, None for other objects."""
+        if not isinstance(ref.get_object(), StreamObject):
+            return None
+        start_time = time.perf_counter()
+        digest = content_digest(ref, self._digest_memo)
+        self.dedupe_stats["seconds"] += time.perf_counter() - start_time
+        return digest
+
+    def _write_object(self, idnum, obj):
+        self.offsets[idnum] = self.stream.tell()
+        self.stream.write(f"{idnum} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(self.stream)
+        self.stream.write(b"\nendobj\n")
+
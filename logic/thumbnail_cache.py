@@ -0,0 +1,263 @@
+"""
+Rendered thumbnails kept on disk between sessions.
+
+Rendering the grid of a document opened every day repeats the same work
+each time. A ThumbnailCache stores every rendered thumbnail as a PNG in
+the user's cache folder, so reopening a known file only decodes small
+images instead of rendering its pages.
+
+Entries are keyed by a content fingerprint of the file (its size plus a
+hash of its first and last 64 KB) and the page and width. The fingerprint
+costs two small reads however big the file is, and still changes when a
+PDF is edited: every save rewrites the cross-reference table and trailer
+at the end of the file. Copies and renames of a file share their entries.
+
+The cache is capped at max_bytes. Reading an entry touches its mtime, and
+trim() removes the least recently used entries once the cap is exceeded.
+Several processes (render workers, or two instances of the application)
+can use the same folder at once: entries are written to a temporary file
+and renamed into place, so a reader sees a whole PNG or none, and an entry
+removed by another process's trim() is just a miss.
+
+This module does not import Qt, so render workers can use it directly.
+"""
+
+import hashlib
+import os
+import sys
+import time
+from collections import OrderedDict
+from logic.output_writer import atomic_output
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Bumped when the stored format changes; older folders are simply ignored
+CACHE_VERSION = 1
+
+# Bytes hashed at each end of the file
+FINGERPRINT_CHUNK = 64 * 1024
+
+# trim() goes this far below the cap, so that it does not run on every write
+TRIM_RATIO = 0.9
+
+# Temporary files older than this were left behind by a crashed writer
+STALE_TEMP_SECONDS = 3600
+
+_APP_FOLDER = "SliceStitchPDF"
+
+
+def default_cache_dir():
+    """
+    The thumbnail folder in the platform's per-user cache location:
+    $XDG_CACHE_HOME (or ~/.cache) on Linux, ~/Library/Caches on macOS and
+    %LOCALAPPDATA% on Windows.
+    """
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        # The XDG spec says to ignore relative paths
+        base = os.environ.get("XDG_CACHE_HOME", "")
+        if not os.path.isabs(base):
+            base = os.path.expanduser("~/.cache")
+    return os.path.join(base, _APP_FOLDER, "thumbnails")
+
+
+def file_fingerprint(path):
+    """
+    A content fingerprint of a file: its size and its first and last
+    FINGERPRINT_CHUNK bytes, hashed.
+
+    Args:
+        path (str): File to fingerprint.
+    Returns:
+        str: 32 hex digits.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(size.to_bytes(8, "little"))
+        digest.update(f.read(FINGERPRINT_CHUNK))
+        if size > FINGERPRINT_CHUNK:
+            f.seek(max(FINGERPRINT_CHUNK, size - FINGERPRINT_CHUNK))
+            digest.update(f.read(FINGERPRINT_CHUNK))
+    return digest.hexdigest()
+
+
+class FingerprintCache:
+    """
+    Remembers file_fingerprint() per file version, so a file is only read
+    again once its size or mtime changes.
+
+    Args:
+        max_files (int): Fingerprints kept, least recently used dropped first.
+    """
+
+    def __init__(self, max_files=64):
+        self.max_files = max_files
+        # (path, size, mtime) -> fingerprint, least recently used first
+        self._fingerprints = OrderedDict()
+
+    def get(self, path):
+        """
+        The content fingerprint of path.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        fingerprint = self._fingerprints.get(key)
+        if fingerprint is None:
+            fingerprint = self._fingerprints[key] = file_fingerprint(path)
+            while len(self._fingerprints) > self.max_files:
+                self._fingerprints.popitem(last=False)
+        else:
+            self._fingerprints.move_to_end(key)
+        return fingerprint
+
+
+class ThumbnailCache:
+    """
+    PNG thumbnails on disk, keyed by (fingerprint, page, width).
+
+    Args:
+        directory (str): Cache folder. None uses default_cache_dir().
+        max_bytes (int): Size cap of all entries together.
+
+    The folder is created with the first put(). Each instance tracks the
+    cache size from its own writes and rescans the folder when trimming,
+    so entries written by other processes are counted at the next trim.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Size of the cache as far as this instance knows; None until scanned
+        self._size = None
+
+    def get(self, fingerprint, page_num, width):
+        """
+        The stored PNG for a thumbnail, or None.
+
+        Args:
+            fingerprint (str): file_fingerprint() of the document.
+            page_num (int): 0-based page of that document.
+            width (int): Thumbnail width in pixels.
+        Returns:
+            bytes: PNG data, or None on a miss.
+        """
+        path = self._entry_path(fingerprint, page_num, width)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            # Mark as recently used; trim() goes by mtime
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, fingerprint, page_num, width, png):
+        """
+        Stores a thumbnail, then trims the cache if it grew over the cap.
+        Failing to write (read-only or full disk) is not an error; the
+        thumbnail is just not cached.
+        """
+        path = self._entry_path(fingerprint, page_num, width)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with atomic_output(path, buffer_size=len(png) + 1) as f:
+                f.write(png)
+        except OSError:
+            return
+        if self._size is None:
+            self._size = self._scan()[1]
+        else:
+            self._size += len(png)
+        if self._size > self.max_bytes:
+            self.trim()
+
+    def discard(self, fingerprint, page_num, width):
+        """Removes one entry, e.g. one that turned out to be unreadable."""
+        try:
+            os.remove(self._entry_path(fingerprint, page_num, width))
+        except OSError:
+            pass
+
+    def trim(self, max_bytes=None):
+        """
+        Removes least recently used entries until the cache is below
+        TRIM_RATIO of max_bytes (default: the cache's cap).
+
+        Returns:
+            int: Bytes removed.
+        """
+        limit = (self.max_bytes if max_bytes is None else max_bytes) * TRIM_RATIO
+        entries, size = self._scan()
+        removed = 0
+        for _, entry_size, path in sorted(entries):
+            if size - removed <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Already removed by another process, or in use on Windows
+                continue
+            removed += entry_size
+        self._size = size - removed
+        return removed
+
+    def clear(self):
+        """Removes every entry."""
+        self.trim(max_bytes=0)
+
+    def stats(self):
+        """Hit and miss counts of this instance."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _entry_path(self, fingerprint, page_num, width):
+        # Subfolders by fingerprint prefix keep folders small
+        return os.path.join(self.directory, f"v{CACHE_VERSION}", fingerprint[:2],
+                            f"{fingerprint}-{page_num}-{width}.png")
+
+    def _scan(self):
+        """
+        Lists the entries as (mtime, size, path), removing stale temporary
+        files on the way. Returns (entries, total size).
+        """
+        entries = []
+        size = 0
+        root = os.path.join(self.directory, f"v{CACHE_VERSION}")
+        stale = time.time() - STALE_TEMP_SECONDS
+        try:
+            folders = [entry.path for entry in os.scandir(root) if entry.is_dir()]
+        except OSError:
+            return entries, size
+        for folder in folders:
+            try:
+                files = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in files:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith(".tmp"):
+                    if stat.st_mtime < stale:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                size += stat.st_size
+        return entries, size
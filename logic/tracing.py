@@ -0,0 +1,186 @@
+"""
+Optional timing traces in the Chrome trace event format.
+
+Turn tracing on with the environment variable
+
+    SLICE_STICH_TRACE=/path/to/trace.json
+
+or the command-line flag `--trace /path/to/trace.json` (GUI and CLI). Spans
+recorded during the session are written to that file when the program
+exits; open it in https://ui.perfetto.dev or chrome://tracing. Each span
+carries the thread it ran on, so work on the split/merge worker thread,
+the output writer threads and the GUI thread shows up side by side.
+Worker processes (parallel split, tree merge, batch jobs and info
+probes) write their own file next to it (trace.<pid>.json); load them
+together to see every process.
+
+When tracing is off, span() returns a shared do-nothing object and traced()
+functions call straight through: the cost is one global lookup per call.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+ENV_VAR = "SLICE_STICH_TRACE"
+
+_enabled = False
+_output_path = None
+_events = []  # list.append is atomic, so threads can record without a lock
+_thread_names = {}
+_save_lock = threading.Lock()
+_atexit_registered = False
+
+
+class _NullSpan:
+    """What span() returns while tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """One timed section; recorded as a complete ("X") event when it ends."""
+
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        thread = threading.current_thread()
+        tid = thread.native_id or 0
+        _thread_names.setdefault(tid, thread.name)
+        event = {"name": self.name, "cat": self.category, "ph": "X",
+                 "ts": self.start / 1000, "dur": (end - self.start) / 1000,
+                 "pid": os.getpid(), "tid": tid}
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if self.args:
+            event["args"] = self.args
+        _events.append(event)
+        return False
+
+    def set(self, **args):
+        """Adds arguments (page counts, sizes, ...) shown with the span."""
+        self.args.update(args)
+
+
+def enable(output_path):
+    """Starts recording; the trace is written to output_path at exit."""
+    global _enabled, _output_path, _atexit_registered
+    _output_path = os.path.abspath(output_path)
+    _enabled = True
+    # Worker processes started later (spawn) pick it up from the environment
+    os.environ[ENV_VAR] = _output_path
+    if not _atexit_registered:
+        atexit.register(save)
+        _atexit_registered = True
+
+
+def disable():
+    """Stops recording. Spans recorded so far are kept until save()."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def span(name, category="app", **args):
+    """
+    Times a with-block:
+
+        with tracing.span("render", page=3):
+            ...
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name=None, category="app"):
+    """Decorator: times every call of the function as one span."""
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def save(output_path=None):
+    """
+    Writes all recorded spans as a Chrome trace JSON file.
+
+    Returns:
+        str: The path written, or None if there was nothing to write.
+    """
+    path = output_path or _output_path
+    if path is None or not _events:
+        return None
+    import multiprocessing
+    if output_path is None and multiprocessing.parent_process() is not None:
+        # A pool worker: keep the main process's file intact
+        root, ext = os.path.splitext(path)
+        path = f"{root}.{os.getpid()}{ext or '.json'}"
+
+    with _save_lock:
+        pid = os.getpid()
+        metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                     "args": {"name": thread_name}}
+                    for tid, thread_name in list(_thread_names.items())]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + list(_events), "displayTimeUnit": "ms"}, f)
+    return path
+
+
+def save_in_worker():
+    """
+    Saves the spans of a pool worker process (as trace.<pid>.json). Pool
+    entry points call this before returning: pool processes are not shut
+    down through atexit, so their spans would otherwise be lost. Does
+    nothing when tracing is off or outside a worker process.
+    """
+    import multiprocessing
+    if _enabled and multiprocessing.parent_process() is not None:
+        save()
+
+
+def _forget_parent_events():
+    _events.clear()
+    _thread_names.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    # A forked worker starts with a copy of the parent's spans; it should
+    # only save its own
+    os.register_at_fork(after_in_child=_forget_parent_events)
+
+if os.environ.get(ENV_VAR):
+    enable(os.environ[ENV_VAR])
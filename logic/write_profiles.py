@@ -0,0 +1,63 @@
+from io import BytesIO
+from pypdf.generic import ArrayObject, StreamObject
+
+# How split and merge outputs get serialized:
+#   fast      pypdf's plain write. Quickest, largest files.
+#   balanced  also Flate-compresses page content streams that are stored
+#             uncompressed. Streams that are already compressed are left as
+#             they are, so the extra cost is only paid where it saves bytes.
+#   compact   balanced, then re-saved through PyMuPDF to pack objects into
+#             object streams, deflate any remaining plain streams and drop
+#             orphaned objects. pypdf cannot write object streams itself.
+#             Slowest, smallest files.
+WRITE_PROFILES = ("fast", "balanced", "compact")
+
+
+def check_profile(profile):
+    """Raises ValueError for an unknown profile name."""
+    if profile not in WRITE_PROFILES:
+        raise ValueError(f"Unknown write profile: {profile!r}")
+
+
+def write_pdf(writer, stream, profile="fast"):
+    """
+    Serializes a PdfWriter to an open binary stream using a write profile.
+
+    Args:
+        writer (PdfWriter): The document to write.
+        stream: Binary file object to write to.
+        profile (str): One of WRITE_PROFILES.
+    """
+    check_profile(profile)
+
+    if profile in ("balanced", "compact"):
+        compress_plain_contents(writer)
+
+    if profile != "compact":
+        writer.write(stream)
+        return
+
+    # Imported lazily: the fast/balanced paths (and the CLI) don't need it
+    import pymupdf
+
+    buffer = BytesIO()
+    writer.write(buffer)
+    doc = pymupdf.open("pdf", buffer.getvalue())
+    try:
+        # Not doc.save(stream): PyMuPDF takes a file object's .name for a
+        # path, which is an int for files opened from a descriptor
+        stream.write(doc.tobytes(garbage=1, deflate=True, use_objstms=1))
+    finally:
+        doc.close()
+
+
+def compress_plain_contents(writer):
+    """Flate-compresses the content streams of pages that store them uncompressed."""
+    for page in writer.pages:
+        if "/Contents" not in page:
+            continue
+        contents = page["/Contents"]
+        streams = ([item.get_object() for item in contents]
+                   if isinstance(contents, ArrayObject) else [contents])
+        if any(isinstance(s, StreamObject) and "/Filter" not in s for s in streams):
+            page.compress_content_streams()
@@ -1,18 +1,39 @@
 import sys
 import os
+import multiprocessing
 
 # Ensure the project root is in python path so we can import modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from PyQt6.QtWidgets import QApplication
-
 # Import version info early (lightweight)
 from version import __version__, __app_name__
 
+# Subcommands that run headless (see cli.py)
+CLI_COMMANDS = ("split", "plan", "merge", "info", "batch")
+
+
+def _take_trace_flag(argv):
+    """
+    Removes "--trace FILE" / "--trace=FILE" from argv and returns FILE (or None).
+    Works before any subcommand, so it applies to the GUI and the CLI alike.
+    """
+    for index, arg in enumerate(argv):
+        if arg == "--trace" and index + 1 < len(argv):
+            path = argv[index + 1]
+            del argv[index:index + 2]
+            return path
+        if arg.startswith("--trace="):
+            del argv[index]
+            return arg.split("=", 1)[1]
+    return None
+
+
 def main():
     """
     Application Entry Point.
 
+    0. Turn on tracing if --trace FILE was given (see logic/tracing.py).
+       If a CLI subcommand was given, run it headless and exit (no Qt).
     1. Create the QApplication (required for any PyQt app).
     2. Show splash screen immediately.
     3. Load heavy modules while splash is visible.
@@ -20,6 +41,18 @@ def main():
     5. Hide splash and show the window.
     6. Start the event loop (app.exec).
     """
+    trace_path = _take_trace_flag(sys.argv)
+    if trace_path:
+        from logic import tracing
+        tracing.enable(trace_path)
+
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        # Imported here so the GUI never pays for argparse & co, and the CLI
+        # never imports PyQt6
+        from cli import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
+
+    from PyQt6.QtWidgets import QApplication
     app = QApplication(sys.argv)
 
     # Set application-wide style
@@ -54,4 +87,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Required for process pools (parallel split) in the frozen Windows build
+    multiprocessing.freeze_support()
     main()